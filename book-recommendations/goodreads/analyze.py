@@ -43,53 +43,61 @@ NONFICTION_GENRES = {
 
 
 def load_books(input_path: Path) -> pd.DataFrame:
-    """Load books CSV and parse genres into lists."""
-    df = pd.read_csv(input_path)
-    df["genre_list"] = df["genres"].fillna("").apply(
-        lambda x: [g.strip() for g in x.split("|") if g.strip()]
+    """Load the rating and genres columns of a books CSV."""
+    return pd.read_csv(input_path, usecols=["my_rating", "genres"])
+
+
+def explode_genres(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split the pipe-delimited genres column into one row per (book, genre).
+
+    Returns a DataFrame with columns book (the book's row label in df),
+    genre and my_rating.
+    """
+    genres = df["genres"].fillna("").astype(str).str.split("|").explode().str.strip()
+    genres = genres[genres != ""]
+    return pd.DataFrame(
+        {
+            "book": genres.index,
+            "genre": genres.values,
+            "my_rating": df.loc[genres.index, "my_rating"].values,
+        }
     )
-    return df
 
 
-def classify_fiction(genres: list[str]) -> str:
-    """Classify a book as Fiction or Non-Fiction based on genres."""
-    genres_lower = {g.lower() for g in genres}
+def classify_fiction(df: pd.DataFrame, genres: pd.DataFrame) -> pd.Series:
+    """Classify each book as Fiction, Non-Fiction or Unknown based on genres."""
+    classes = pd.Series("Unknown", index=df.index)
+
+    # Default to fiction if has any genres
+    classes[df.index.isin(genres["book"])] = "Fiction"
 
     # Check for explicit non-fiction markers
-    if genres_lower & NONFICTION_GENRES:
-        return "Non-Fiction"
+    is_nonfiction = genres["genre"].str.lower().isin(NONFICTION_GENRES)
+    classes[df.index.isin(genres.loc[is_nonfiction, "book"])] = "Non-Fiction"
 
-    # Default to fiction if has any genres, unknown if none
-    return "Fiction" if genres else "Unknown"
+    return classes
 
 
-def count_genres(df: pd.DataFrame) -> Counter:
+def count_genres(genres: pd.DataFrame) -> Counter:
     """Count occurrences of each genre across all books."""
-    genre_counts = Counter()
-    for genres in df["genre_list"]:
-        genre_counts.update(genres)
-    return genre_counts
+    counts = genres.groupby("genre", sort=False).size()
+    return Counter(dict(zip(counts.index, counts.tolist())))
 
 
-def rating_by_genre(df: pd.DataFrame) -> dict[str, dict]:
+def rating_by_genre(genres: pd.DataFrame) -> dict[str, dict]:
     """Calculate average rating per genre."""
-    genre_ratings: dict[str, list[int]] = {}
-
-    for _, row in df.iterrows():
-        rating = row["my_rating"]
-        if rating == 0:  # Skip unrated books
-            continue
-        for genre in row["genre_list"]:
-            if genre not in genre_ratings:
-                genre_ratings[genre] = []
-            genre_ratings[genre].append(rating)
+    rated = genres[genres["my_rating"] != 0]  # Skip unrated books
+    stats = rated.groupby("genre", sort=False)["my_rating"].agg(["mean", "count"])
 
     return {
         genre: {
-            "avg": sum(ratings) / len(ratings),
-            "count": len(ratings),
+            "avg": avg,
+            "count": count,
         }
-        for genre, ratings in genre_ratings.items()
+        for genre, avg, count in zip(
+            stats.index, stats["mean"].tolist(), stats["count"].tolist()
+        )
     }
 
 
@@ -116,10 +124,9 @@ def plot_genre_histogram(genre_counts: Counter, output_path: Path, top_n: int =
     plt.close()
 
 
-def plot_fiction_breakdown(df: pd.DataFrame, output_path: Path):
+def plot_fiction_breakdown(fiction_classes: pd.Series, output_path: Path):
     """Create pie chart of fiction vs non-fiction."""
-    df["fiction_class"] = df["genre_list"].apply(classify_fiction)
-    counts = df["fiction_class"].value_counts()
+    counts = fiction_classes.value_counts()
 
     # Filter out Unknown if present
     counts = counts[counts.index != "Unknown"]
@@ -253,12 +260,14 @@ def analyze_genres(input_path: Path, output_dir: Path) -> dict:
     df = load_books(input_path)
 
     # Compute statistics
-    genre_counts = count_genres(df)
-    genre_stats = rating_by_genre(df)
+    genres = explode_genres(df)
+    genre_counts = count_genres(genres)
+    genre_stats = rating_by_genre(genres)
+    fiction_classes = classify_fiction(df, genres)
 
     # Generate plots
     plot_genre_histogram(genre_counts, output_dir / "genre_histogram.png")
-    fiction_counts = plot_fiction_breakdown(df, output_dir / "fiction_breakdown.png")
+    fiction_counts = plot_fiction_breakdown(fiction_classes, output_dir / "fiction_breakdown.png")
     plot_rating_by_genre(genre_stats, output_dir / "rating_by_genre.png")
 
     # Write text summary
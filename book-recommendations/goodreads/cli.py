@@ -6,6 +6,8 @@ from pathlib import Path
 
 from .analyze import analyze_genres
 from .clean import clean_export
+from .fetch import DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL, ResponseCache
+from .parsing import DEFAULT_PARSE_WORKERS
 from .scrape import add_genres
 
 
@@ -32,18 +34,30 @@ def cmd_genres(args: argparse.Namespace) -> int:
         print(f"Error: Input file not found: {input_path}", file=sys.stderr)
         return 1
 
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(Path(args.cache_dir), ttl=args.cache_ttl * 3600)
+
     try:
         total, with_genres = add_genres(
             input_path,
             output_path,
             concurrency=args.concurrency,
             max_retries=args.retry,
+            parse_workers=args.parse_workers,
+            cache=cache,
+            resume=not args.no_resume,
         )
         print(f"Processed {total} books, {with_genres} with genres found")
         print(f"Output written to {output_path}")
+        if cache:
+            print(cache.summary())
         return 0
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
     except KeyboardInterrupt:
-        print("\nInterrupted - partial results may have been written")
+        print(f"\nInterrupted - finished rows are saved in {output_path}; rerun to resume")
         return 130
 
 
@@ -98,6 +112,33 @@ def main() -> int:
         default=3,
         help="Max retry attempts per book (default: 3)",
     )
+    genres_parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=DEFAULT_PARSE_WORKERS,
+        help=f"Processes for HTML parsing, 0 to parse in-process (default: {DEFAULT_PARSE_WORKERS})",
+    )
+    genres_parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory for cached Goodreads pages",
+    )
+    genres_parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL / 3600,
+        help=f"Hours before a cached page is revalidated (default: {DEFAULT_CACHE_TTL // 3600})",
+    )
+    genres_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch every page from Goodreads, bypassing the cache",
+    )
+    genres_parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Overwrite the output instead of skipping books already in it",
+    )
     genres_parser.set_defaults(func=cmd_genres)
 
     # analyze subcommand
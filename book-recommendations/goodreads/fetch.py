@@ -0,0 +1,271 @@
+"""Shared page fetching for the Goodreads scrapers.
+
+Pages are kept in an on-disk response cache so reruns don't refetch
+them. Each page is stored gzip-compressed under the SHA-256 of its URL.
+Once an entry is older than the cache TTL it is revalidated with a
+conditional request (ETag / Last-Modified), and the page is only
+downloaded again if Goodreads says it changed.
+
+Requests that do go out are paced by a per-host token bucket whose rate
+adapts AIMD-style: it creeps up while requests succeed and halves when
+Goodreads pushes back with a 429 or 5xx, honoring any Retry-After.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "http_cache"
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60  # One week
+
+# Requests per second per host; the limiter adapts between min and max
+DEFAULT_RATE = 2.0
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 10.0
+RATE_INCREASE = 0.1  # Added to the rate after each successful request
+
+
+@dataclass
+class CachedPage:
+    """A cached page and the validators needed to revalidate it."""
+
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """On-disk cache of fetched pages, with hit-rate counters."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_CACHE_TTL,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.hits = 0  # Served from disk, no request
+        self.revalidated = 0  # Server answered 304 Not Modified
+        self.misses = 0  # Page downloaded
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page for a URL, or None (fresh or not)."""
+        try:
+            with gzip.open(self._path(url), "rt", encoding="utf-8") as f:
+                page = CachedPage(**json.load(f))
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return page if page.url == url else None
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedPage:
+        """Store a freshly downloaded page."""
+        page = CachedPage(url, html, time.time(), etag, last_modified)
+        self._write(page)
+        return page
+
+    def refresh(self, page: CachedPage) -> None:
+        """Mark a revalidated page as fresh again."""
+        page.fetched_at = time.time()
+        self._write(page)
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """Check whether a page is young enough to use without revalidating."""
+        return time.time() - page.fetched_at < self.ttl
+
+    def _write(self, page: CachedPage) -> None:
+        path = self._path(page.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(json.dumps(asdict(page)).encode("utf-8"))
+
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of pages served without downloading them."""
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def summary(self) -> str:
+        """One-line description of cache effectiveness."""
+        return (
+            f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} downloaded ({self.hit_rate:.0%} hit rate)"
+        )
+
+
+@dataclass
+class _Bucket:
+    """Token bucket state for one host."""
+
+    rate: float
+    tokens: float = 1.0
+    updated: float = field(default_factory=time.monotonic)
+    blocked_until: float = 0.0  # From Retry-After
+    last_decrease: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class RateLimiter:
+    """
+    Per-host token-bucket rate limiter with AIMD adaptation.
+
+    Share one limiter between all tasks hitting a host so they back off
+    together instead of each retrying on its own schedule.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        increase: float = RATE_INCREASE,
+    ):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, host: str) -> _Bucket:
+        if host not in self._buckets:
+            self._buckets[host] = _Bucket(rate=self.initial_rate)
+        return self._buckets[host]
+
+    def rate(self, host: str) -> float:
+        """Current request rate for a host, in requests per second."""
+        return self._bucket(host).rate
+
+    async def acquire(self, host: str) -> None:
+        """Wait until a request to host is allowed."""
+        bucket = self._bucket(host)
+        # Waiters queue on the lock, so tokens go out in arrival order
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                if bucket.blocked_until > now:
+                    await asyncio.sleep(bucket.blocked_until - now)
+                    continue
+
+                bucket.tokens = min(
+                    1.0, bucket.tokens + (now - bucket.updated) * bucket.rate
+                )
+                bucket.updated = now
+                if bucket.tokens >= 1.0:
+                    bucket.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - bucket.tokens) / bucket.rate)
+
+    def record(self, host: str, status: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the host's rate to a response status."""
+        bucket = self._bucket(host)
+        now = time.monotonic()
+
+        if status == 429 or status >= 500:
+            # Several in-flight requests often fail together; count that
+            # as one signal rather than halving once per response
+            if now - bucket.last_decrease >= 1.0 / bucket.rate:
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.last_decrease = now
+            delay = _parse_retry_after(retry_after)
+            if delay:
+                bucket.blocked_until = max(bucket.blocked_until, now + delay)
+        elif status < 400:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_html(
+    session: aiohttp.ClientSession,
+    url: str,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> tuple[int, Optional[str]]:
+    """
+    Make one request for a page, going through the cache if given.
+
+    Network requests wait for the rate limiter if there is one, and
+    report their status back to it. Cache hits skip the limiter.
+
+    Returns (status, html). html is only set when status is 200; a page
+    served from the cache or revalidated with a 304 reports status 200.
+    """
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(cached):
+        cache.hits += 1
+        return 200, cached.html
+
+    headers = {}
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    host = urlsplit(url).netloc
+    if limiter:
+        await limiter.acquire(host)
+
+    async with session.get(url, headers=headers) as response:
+        if limiter:
+            limiter.record(host, response.status, response.headers.get("Retry-After"))
+        if response.status == 304 and cached:
+            cache.revalidated += 1
+            cache.refresh(cached)
+            return 200, cached.html
+        if response.status != 200:
+            return response.status, None
+        html = await response.text()
+
+    if cache:
+        cache.misses += 1
+        cache.put(
+            url,
+            html,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+    return 200, html
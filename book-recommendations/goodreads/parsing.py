@@ -0,0 +1,68 @@
+"""Shared HTML parsing helpers for the Goodreads scrapers.
+
+Parsers use lxml with precompiled XPath selectors rather than building a
+BeautifulSoup tree, and can run in a process pool so parsing doesn't
+block the asyncio event loop that drives the network requests.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TypeVar
+
+import lxml.html
+from lxml import etree
+
+# Processes used for HTML parsing (0 parses on the event loop)
+DEFAULT_PARSE_WORKERS = 2
+
+T = TypeVar("T")
+
+# Text nodes as BeautifulSoup's get_text() sees them (no script/style)
+_TEXT_NODES = etree.XPath(
+    ".//text()[not(ancestor::script) and not(ancestor::style)]"
+)
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+def parse_html(html: str) -> etree._Element:
+    """Parse an HTML page into an lxml tree."""
+    if not html.strip():
+        html = "<html></html>"
+    return lxml.html.document_fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+
+
+def get_text(element: etree._Element, strip: bool = False) -> str:
+    """Return an element's text, like BeautifulSoup's get_text(strip=...)."""
+    texts = _TEXT_NODES(element)
+    if strip:
+        return "".join(t.strip() for t in texts)
+    return "".join(texts)
+
+
+def first(xpath: etree.XPath, element: etree._Element) -> Optional[etree._Element]:
+    """Return the first element an XPath selects, or None."""
+    matches = xpath(element)
+    return matches[0] if matches else None
+
+
+@contextmanager
+def parse_pool(workers: int = DEFAULT_PARSE_WORKERS) -> Iterator[Optional[Executor]]:
+    """Yield a process pool for parsing, or None to parse in-process."""
+    if workers <= 0:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+async def run_parser(
+    pool: Optional[Executor],
+    parser: Callable[..., T],
+    *args,
+) -> T:
+    """Run a parser in the pool (or inline if there is none)."""
+    if pool is None:
+        return parser(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, parser, *args)
@@ -2,43 +2,67 @@
 
 import asyncio
 import csv
+import json
+import os
 import random
+from concurrent.futures import Executor
 from pathlib import Path
+from typing import Optional, TextIO
 
 import aiohttp
-from bs4 import BeautifulSoup
+from lxml import etree
 from tqdm.asyncio import tqdm
 
+from .fetch import RateLimiter, ResponseCache, fetch_html
+from .parsing import DEFAULT_PARSE_WORKERS, get_text, parse_html, parse_pool, run_parser
+from .workers import run_worker_pool, summarize_workers
+
 GOODREADS_URL = "https://www.goodreads.com/book/show/{book_id}"
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+CHECKPOINT_EVERY = 25  # Rows between output checkpoints
+
+# Goodreads uses data-testid for genre buttons
+_GENRE_LINKS = etree.XPath(
+    '//*[@data-testid="genresList"]//a[contains(@href, "/genres/")]'
+)
+# Older page structure: any genre link
+_ANY_GENRE_LINKS = etree.XPath('//a[contains(@href, "/genres/")]')
 
 
 async def fetch_genres(
     session: aiohttp.ClientSession,
     book_id: str,
     max_retries: int = 3,
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> list[str]:
     """
     Fetch genres for a single book from Goodreads.
 
-    Uses exponential backoff with jitter on failure.
+    Requests are paced by the rate limiter if there is one; otherwise
+    uses exponential backoff with jitter on failure. Parses in the given
+    process pool if there is one, and pages come from the response cache
+    when it has them.
     Returns empty list if all retries fail.
     """
     url = GOODREADS_URL.format(book_id=book_id)
 
     for attempt in range(max_retries):
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    return parse_genres(html)
-                elif response.status == 429:
-                    # Rate limited - wait longer
-                    wait = (2 ** attempt) + random.uniform(1, 3)
-                    await asyncio.sleep(wait)
-                else:
-                    # Other error - brief backoff
-                    await asyncio.sleep(0.5 * (attempt + 1))
+            status, html = await fetch_html(session, url, cache, limiter)
+            if status == 200:
+                return await run_parser(pool, parse_genres, html)
+            elif limiter and (status == 429 or status >= 500):
+                # The limiter has slowed down for everyone; just retry
+                continue
+            elif status == 429:
+                # Rate limited - wait longer
+                wait = (2 ** attempt) + random.uniform(1, 3)
+                await asyncio.sleep(wait)
+            else:
+                # Other error - brief backoff
+                await asyncio.sleep(0.5 * (attempt + 1))
         except (aiohttp.ClientError, asyncio.TimeoutError):
             wait = (2 ** attempt) * 0.5 + random.uniform(0, 0.5)
             await asyncio.sleep(wait)
@@ -48,40 +72,73 @@ async def fetch_genres(
 
 def parse_genres(html: str) -> list[str]:
     """Extract genre list from Goodreads book page HTML."""
-    soup = BeautifulSoup(html, "lxml")
+    tree = parse_html(html)
 
     genres = []
-    # Goodreads uses data-testid for genre buttons
-    genre_elements = soup.select('[data-testid="genresList"] a[href*="/genres/"]')
-
-    for el in genre_elements:
-        genre = el.get_text(strip=True)
+    for el in _GENRE_LINKS(tree):
+        genre = get_text(el, strip=True)
         if genre and genre not in genres:
             genres.append(genre)
 
     # Fallback: try older page structure
     if not genres:
-        for link in soup.select('a[href*="/genres/"]'):
-            genre = link.get_text(strip=True)
+        for link in _ANY_GENRE_LINKS(tree):
+            genre = get_text(link, strip=True)
             if genre and genre not in genres and len(genre) < 50:
                 genres.append(genre)
 
     return genres
 
 
-async def process_book(
-    session: aiohttp.ClientSession,
-    semaphore: asyncio.Semaphore,
-    book: dict,
-    max_retries: int,
-    pbar: tqdm,
-) -> dict:
-    """Process a single book: fetch genres and update the record."""
-    async with semaphore:
-        genres = await fetch_genres(session, book["goodreads_id"], max_retries)
-        book["genres"] = "|".join(genres)
-        pbar.update(1)
-        return book
+def _progress_path(output_path: Path) -> Path:
+    """Checkpoint file recording how much of the output is known good."""
+    return output_path.with_name(output_path.name + ".progress")
+
+
+def _resume_output(output_path: Path, fieldnames: list[str]) -> set[str]:
+    """
+    Prepare an existing output file for appending.
+
+    Truncates anything written after the last checkpoint (a row torn by a
+    crash). fetch_genres returns no genres when its retries fail, so rows
+    without genres are dropped to be fetched again. Returns the ids of the
+    rows kept.
+    """
+    progress_path = _progress_path(output_path)
+    if progress_path.exists():
+        offset = json.loads(progress_path.read_text())["offset"]
+        with open(output_path, "r+b") as f:
+            f.truncate(offset)
+
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames != fieldnames:
+            raise ValueError(
+                f"{output_path} has different columns than the input; "
+                "remove it or pass resume=False to start over"
+            )
+        rows = list(reader)
+    kept = [row for row in rows if row.get("genres")]
+
+    if len(kept) < len(rows):
+        tmp = output_path.with_name(output_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(kept)
+        # The old checkpoint offset doesn't apply to the rewritten file
+        progress_path.unlink(missing_ok=True)
+        os.replace(tmp, output_path)
+    return {row["goodreads_id"] for row in kept}
+
+
+def _checkpoint(f: TextIO, progress_path: Path) -> None:
+    """Flush the output to disk and record its size as known good."""
+    f.flush()
+    os.fsync(f.fileno())
+    tmp = progress_path.with_name(progress_path.name + ".tmp")
+    tmp.write_text(json.dumps({"offset": f.tell()}))
+    os.replace(tmp, progress_path)
 
 
 async def add_genres_async(
@@ -89,56 +146,95 @@ async def add_genres_async(
     output_path: Path,
     concurrency: int = 5,
     max_retries: int = 3,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    cache: Optional[ResponseCache] = None,
+    resume: bool = True,
 ) -> tuple[int, int]:
     """
     Add genres to a clean Goodreads export.
 
-    Returns (total_books, books_with_genres).
+    Books are streamed from the input through a bounded worker pool of
+    concurrency workers, and each row is appended to the output as soon
+    as its genres are in, so an interruption keeps everything finished
+    so far. Progress is checkpointed every CHECKPOINT_EVERY rows; with
+    resume, books already in the output with genres are skipped and the
+    rest are fetched again. Rows are written in completion order.
+
+    Pages are parsed in a pool of parse_workers processes, so parsing
+    doesn't hold up the network requests. If a response cache is given,
+    pages already in it are not downloaded again. Downloads share one
+    adaptive rate limiter, so concurrency only bounds requests in flight.
+
+    Returns (total_books, books_with_genres), counting resumed rows.
     """
-    # Read input
-    with open(input_path, "r", encoding="utf-8") as f:
+    with open(input_path, "r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
-        books = list(reader)
+        fieldnames = list(reader.fieldnames or [])
+        total = sum(1 for _ in reader)
 
-    if not books:
+    if not total:
         return 0, 0
 
+    if "genres" not in fieldnames:
+        fieldnames.append("genres")
+
+    done: set[str] = set()
+    if resume and output_path.exists():
+        done = _resume_output(output_path, fieldnames)
+    books_with_genres = len(done)
+
     # Setup async scraping
-    semaphore = asyncio.Semaphore(concurrency)
     timeout = aiohttp.ClientTimeout(total=30)
     headers = {"User-Agent": USER_AGENT}
 
     connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    limiter = RateLimiter()
+    progress_path = _progress_path(output_path)
+    written = 0
 
-    with tqdm(total=len(books), desc="Fetching genres", unit="book") as pbar:
-        async with aiohttp.ClientSession(
-            timeout=timeout,
-            headers=headers,
-            connector=connector,
-        ) as session:
-            # Use TaskGroup for structured concurrency (Python 3.11+)
-            async with asyncio.TaskGroup() as tg:
-                tasks = [
-                    tg.create_task(
-                        process_book(session, semaphore, book, max_retries, pbar)
-                    )
-                    for book in books
-                ]
-
-            results = [task.result() for task in tasks]
+    with (
+        open(output_path, "a" if done else "w", encoding="utf-8", newline="") as out,
+        parse_pool(parse_workers) as pool,
+        tqdm(total=total, initial=len(done), desc="Fetching genres", unit="book") as pbar,
+    ):
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        if not done:
+            writer.writeheader()
+        _checkpoint(out, progress_path)
 
-    # Write output
-    fieldnames = list(books[0].keys())
-    if "genres" not in fieldnames:
-        fieldnames.append("genres")
+        async def process_book(book: dict) -> None:
+            nonlocal books_with_genres, written
+            genres = await fetch_genres(
+                session, book["goodreads_id"], max_retries, pool, cache, limiter
+            )
+            book["genres"] = "|".join(genres)
+            writer.writerow(book)
+            books_with_genres += bool(genres)
+            written += 1
+            if written % CHECKPOINT_EVERY == 0:
+                _checkpoint(out, progress_path)
+            pbar.update(1)
 
-    with open(output_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+        try:
+            async with aiohttp.ClientSession(
+                timeout=timeout,
+                headers=headers,
+                connector=connector,
+            ) as session:
+                with open(input_path, "r", encoding="utf-8", newline="") as f:
+                    pending = (
+                        book
+                        for book in csv.DictReader(f)
+                        if book["goodreads_id"] not in done
+                    )
+                    stats = await run_worker_pool(pending, process_book, concurrency)
+            pbar.write(summarize_workers(stats))
+        finally:
+            # Rows are written whole, so everything so far is safe to keep
+            _checkpoint(out, progress_path)
 
-    books_with_genres = sum(1 for b in results if b.get("genres"))
-    return len(results), books_with_genres
+    progress_path.unlink()
+    return total, books_with_genres
 
 
 def add_genres(
@@ -146,6 +242,9 @@ def add_genres(
     output_path: str | Path,
     concurrency: int = 5,
     max_retries: int = 3,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    cache: Optional[ResponseCache] = None,
+    resume: bool = True,
 ) -> tuple[int, int]:
     """
     Synchronous wrapper for add_genres_async.
@@ -158,5 +257,8 @@ def add_genres(
             Path(output_path),
             concurrency,
             max_retries,
+            parse_workers,
+            cache,
+            resume,
         )
     )
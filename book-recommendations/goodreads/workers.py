@@ -0,0 +1,82 @@
+"""Bounded async worker pool for the scrapers.
+
+A fixed number of workers pull items from an asyncio.Queue that a
+producer fills from any iterable. The queue is bounded, so the producer
+waits while workers are busy and memory stays flat however many items
+there are, unlike creating one task per item up front.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_STOP = object()  # Queue sentinel telling a worker to exit
+
+
+@dataclass
+class WorkerStats:
+    """What one worker did during a run."""
+
+    worker: int
+    completed: int = 0
+    failed: int = 0  # Handler raised an exception
+    busy_seconds: float = 0.0
+
+
+async def run_worker_pool(
+    items: Iterable[T],
+    handle: Callable[[T], Awaitable[object]],
+    workers: int,
+    queue_size: Optional[int] = None,
+) -> list[WorkerStats]:
+    """
+    Run handle on every item with a fixed number of workers.
+
+    An item whose handler raises is counted as failed and the worker moves
+    on. If the pool is cancelled (e.g. Ctrl+C), the producer stops, the
+    workers are cancelled and awaited so their cleanup runs, and the
+    cancellation propagates.
+
+    Returns per-worker stats.
+    """
+    workers = max(1, workers)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or workers * 2)
+    stats = [WorkerStats(worker=i) for i in range(workers)]
+
+    async def produce() -> None:
+        for item in items:
+            await queue.put(item)
+        for _ in range(workers):
+            await queue.put(_STOP)
+
+    async def work(worker_stats: WorkerStats) -> None:
+        while (item := await queue.get()) is not _STOP:
+            start = time.monotonic()
+            try:
+                await handle(item)
+                worker_stats.completed += 1
+            except Exception:
+                worker_stats.failed += 1
+            finally:
+                worker_stats.busy_seconds += time.monotonic() - start
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(produce())
+        for worker_stats in stats:
+            tg.create_task(work(worker_stats))
+
+    return stats
+
+
+def summarize_workers(stats: list[WorkerStats]) -> str:
+    """One-line summary of a worker pool run."""
+    completed = sum(s.completed for s in stats)
+    failed = sum(s.failed for s in stats)
+    busy = [s.busy_seconds for s in stats]
+    return (
+        f"{len(stats)} workers: {completed} done, {failed} failed, "
+        f"busy {min(busy):.1f}-{max(busy):.1f}s per worker"
+    )
@@ -0,0 +1,132 @@
+"""Incremental candidate aggregation from cached searches.
+
+The aggregator keeps a persistent map from normalized (title|author) key
+to a merged Candidate, plus a watermark: the newest searched_at it has
+processed. Each update only reads searches cached after the watermark,
+so new searches are folded in without recomputing the whole pool. A
+search that was re-run (e.g. after its cache entry expired) has its
+earlier contribution retracted before the new results are added.
+"""
+
+import json
+import re
+from dataclasses import asdict
+from pathlib import Path
+
+from .candidates import Candidate, extract_candidates_from_search_results
+from .library import BookLibrary
+from .storage import write_atomic
+
+CANDIDATE_POOL_FILE = "candidates.json"
+_POOL_VERSION = 2
+
+
+class CandidateAggregator:
+    """Candidates merged from every cached search, updated incrementally."""
+
+    def __init__(self, library: BookLibrary, path: Path | None = None):
+        self.library = library
+        self.path = path or library.path / CANDIDATE_POOL_FILE
+        self.watermark = ""
+        self.pool: dict[str, Candidate] = {}
+        # "search_type:key" -> searched_at, its source, and the keys it added
+        self.searches: dict[str, dict] = {}
+        self._load()
+
+    def update(self) -> int:
+        """
+        Fold in searches cached since the last update and save the pool.
+
+        Returns the number of searches processed.
+        """
+        processed = 0
+        for search_type, key, data in self.library.store.iter_searches_since(
+            self.watermark
+        ):
+            search_id = f"{search_type}:{key}"
+            searched_at = data.get("searched_at", "")
+            previous = self.searches.get(search_id)
+            if previous and previous["searched_at"] == searched_at:
+                continue
+            if previous:
+                self._retract(search_id)
+
+            source = _search_source(search_type, data)
+            keys = []
+            for candidate in extract_candidates_from_search_results(
+                data.get("results", []), source
+            ):
+                self._add(candidate)
+                keys.append(candidate.normalized_key)
+
+            self.searches[search_id] = {
+                "searched_at": searched_at,
+                "source": source,
+                "keys": keys,
+            }
+            self.watermark = max(self.watermark, searched_at)
+            processed += 1
+
+        if processed:
+            self.save()
+        return processed
+
+    def candidates(self) -> list[Candidate]:
+        """Return the merged candidates, highest frequency first."""
+        return sorted(self.pool.values(), key=lambda c: c.frequency_score, reverse=True)
+
+    def save(self) -> None:
+        """Write the pool and watermark to disk."""
+        state = {
+            "version": _POOL_VERSION,
+            "watermark": self.watermark,
+            "searches": self.searches,
+            "candidates": [asdict(c) for c in self.pool.values()],
+        }
+        write_atomic(self.path, json.dumps(state, indent=2))
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        state = json.loads(self.path.read_text())
+        if state.get("version") != _POOL_VERSION:
+            return  # Rebuild from scratch
+        self.watermark = state["watermark"]
+        self.searches = state["searches"]
+        self.pool = {
+            c["normalized_key"]: Candidate(**c) for c in state["candidates"]
+        }
+
+    def _add(self, candidate: Candidate) -> None:
+        """Merge a candidate into the pool under its normalized key."""
+        existing = self.pool.get(candidate.normalized_key)
+        if existing is None:
+            self.pool[candidate.normalized_key] = candidate
+        else:
+            existing.sources.extend(candidate.sources)
+            existing.frequency_score += candidate.frequency_score
+
+    def _retract(self, search_id: str) -> None:
+        """Remove one search's earlier contribution from the pool."""
+        search = self.searches.pop(search_id)
+        for key in search["keys"]:
+            candidate = self.pool.get(key)
+            if candidate is None:
+                continue
+            # Each result added one copy of the source and 1.0 to the score
+            if search["source"] in candidate.sources:
+                candidate.sources.remove(search["source"])
+                candidate.frequency_score -= 1.0
+            if not candidate.sources:
+                del self.pool[key]
+
+
+def _search_source(search_type: str, data: dict) -> dict:
+    """Source info for a cached search's candidates."""
+    query = data.get("query", "")
+    source = {"type": search_type, "query": query}
+    if search_type == "similar":
+        # Searches cached before seeds were stored still quote the title
+        quoted = re.search(r'"([^"]+)"', query)
+        source["seed"] = data.get("seed") or (quoted.group(1) if quoted else "")
+    return source
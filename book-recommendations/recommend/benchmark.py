@@ -0,0 +1,107 @@
+"""Benchmark book/author extraction over a corpus of cached search results."""
+
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from .extract import PATTERNS, extract_many
+from .library import BookLibrary
+
+# Sample cached searches (one JSON search record per line)
+FIXTURE_CORPUS = Path(__file__).parent / "fixtures" / "search_results.jsonl"
+
+
+# The extractor as it was before the pattern set, for comparison: both
+# forms over title + snippet, with no prefilter
+_ORIGINAL_BY_RE = re.compile(
+    r'"?([^"]+)"?\s+by\s+([A-Z][a-zA-Z\.\s]+?)(?:\s*[-–—]|\s*\||\s*$)',
+    re.IGNORECASE,
+)
+_ORIGINAL_AUTHOR_FIRST_RE = re.compile(r"([A-Z][a-zA-Z\.\s]+?)\s*[-–—:]\s*([^,\|]+)")
+
+
+def _original_title_by_author(
+    title: str, snippet: str, text: str
+) -> Optional[tuple[str, str]]:
+    match = _ORIGINAL_BY_RE.search(text)
+    if match:
+        return match.group(1).strip().strip('"'), match.group(2)
+    return None
+
+
+def _original_author_first(
+    title: str, snippet: str, text: str
+) -> Optional[tuple[str, str]]:
+    match = _ORIGINAL_AUTHOR_FIRST_RE.search(text)
+    if match:
+        author = match.group(1).strip()
+        if 2 <= len(author.split()) <= 4:
+            return match.group(2).strip().strip('"'), author
+    return None
+
+
+ORIGINAL_PATTERNS = [
+    ("title_by_author", _original_title_by_author),
+    ("author_first", _original_author_first),
+]
+
+
+def load_corpus(path: Path = FIXTURE_CORPUS) -> list[dict]:
+    """Load the search results from a JSONL file of cached searches."""
+    results = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                results.extend(json.loads(line)["results"])
+    return results
+
+
+def load_library_corpus(library: BookLibrary) -> list[dict]:
+    """Collect the search results from every search cached in a library."""
+    return [
+        result
+        for _, _, data in library.store.iter_searches()
+        for result in data.get("results", [])
+    ]
+
+
+def benchmark_extraction(
+    results: list[dict],
+    patterns=PATTERNS,
+    repeat: int = 20,
+) -> dict:
+    """
+    Time extraction over results and measure how many it extracts.
+
+    Returns result count, extracted count, yield (fraction extracted),
+    throughput in results per second, and hits per pattern.
+    """
+    extractions = extract_many(results, patterns)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_many(results, patterns)
+    elapsed = time.perf_counter() - start
+
+    extracted = sum(1 for e in extractions if e.book and e.author)
+    return {
+        "results": len(results),
+        "extracted": extracted,
+        "yield": extracted / len(results) if results else 0.0,
+        "per_second": len(results) * repeat / elapsed if elapsed else 0.0,
+        "by_pattern": Counter(e.pattern for e in extractions if e.pattern),
+    }
+
+
+def run_benchmark(results: list[dict], repeat: int = 20) -> str:
+    """Benchmark the original extractor against the full pattern set."""
+    lines = [f"{'Patterns':<10} {'Yield':>14} {'Results/s':>12}  Hits by pattern"]
+    for name, patterns in (("original", ORIGINAL_PATTERNS), ("all", PATTERNS)):
+        stats = benchmark_extraction(results, patterns, repeat)
+        hits = ", ".join(f"{p} {n}" for p, n in stats["by_pattern"].most_common())
+        found = f"{stats['extracted']}/{stats['results']} ({stats['yield']:.0%})"
+        lines.append(f"{name:<10} {found:>14} {stats['per_second']:>12,.0f}  {hits}")
+    return "\n".join(lines)
@@ -1,20 +1,43 @@
 """Candidate compilation, deduplication, and scoring."""
 
 import csv
+import os
+import pickle
 import re
+from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from .config import (
     AVOID_AUTHORS,
     FAVORITE_AUTHORS,
     FUZZY_MATCH_THRESHOLD,
+    NORMALIZE_CACHE_SIZE,
     READ_BOOKS_CSV,
+    READ_MATCH_THRESHOLD,
 )
 
+# Rows of authors scored per cdist call when building author blocks
+_AUTHOR_BLOCK_CHUNK_SIZE = 1024
+
+# Bump when the cached read-books format or normalization rules change
+_READ_CACHE_VERSION = 1
+
+# Title normalization patterns
+_SUBTITLE_RE = re.compile(r":.*$")
+_SERIES_PAREN_RE = re.compile(
+    r"\s*\([^)]*(?:#|book|vol|volume)\s*\d+[^)]*\)", re.IGNORECASE
+)
+_SERIES_SUFFIX_RE = re.compile(r"\s*#\d+\s*$")
+_THE_PREFIX_RE = re.compile(r"^the\s+")
+
+# Author normalization patterns
+_INITIAL_PERIOD_RE = re.compile(r"\.(?=\s|$|[A-Z])")
+
 
 @dataclass
 class Candidate:
@@ -32,6 +55,7 @@ class Candidate:
             self.normalized_key = normalize_key(self.title, self.author)
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_title(title: str) -> str:
     """
     Normalize a book title for comparison.
@@ -45,14 +69,14 @@ def normalize_title(title: str) -> str:
     title = title.lower().strip()
 
     # Remove subtitle
-    title = re.sub(r":.*$", "", title)
+    title = _SUBTITLE_RE.sub("", title)
 
     # Remove series indicators
-    title = re.sub(r"\s*\([^)]*(?:#|book|vol|volume)\s*\d+[^)]*\)", "", title, flags=re.IGNORECASE)
-    title = re.sub(r"\s*#\d+\s*$", "", title)
+    title = _SERIES_PAREN_RE.sub("", title)
+    title = _SERIES_SUFFIX_RE.sub("", title)
 
     # Remove "the" prefix
-    title = re.sub(r"^the\s+", "", title)
+    title = _THE_PREFIX_RE.sub("", title)
 
     # Clean whitespace
     title = " ".join(title.split())
@@ -60,6 +84,7 @@ def normalize_title(title: str) -> str:
     return title
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_author(author: str) -> str:
     """
     Normalize an author name for comparison.
@@ -71,7 +96,7 @@ def normalize_author(author: str) -> str:
     author = author.lower().strip()
 
     # Remove periods from initials
-    author = re.sub(r"\.(?=\s|$|[A-Z])", "", author)
+    author = _INITIAL_PERIOD_RE.sub("", author)
     author = author.replace(".", "")
 
     # Clean whitespace
@@ -85,6 +110,14 @@ def normalize_key(title: str, author: str) -> str:
     return f"{normalize_title(title)}|{normalize_author(author)}"
 
 
+def normalization_cache_info() -> dict[str, dict]:
+    """Return hit/miss counters for the title and author normalization caches."""
+    return {
+        name: func.cache_info()._asdict()
+        for name, func in (("title", normalize_title), ("author", normalize_author))
+    }
+
+
 def are_duplicates(
     title1: str,
     author1: str,
@@ -120,94 +153,264 @@ def are_duplicates(
     return True
 
 
-def deduplicate_candidates(candidates: list[Candidate]) -> list[Candidate]:
+def deduplicate_candidates(
+    candidates: list[Candidate],
+    threshold: int = FUZZY_MATCH_THRESHOLD,
+) -> list[Candidate]:
     """
     Deduplicate candidates, merging sources for duplicates.
 
-    Uses fuzzy matching to catch near-duplicates.
+    Uses fuzzy matching to catch near-duplicates. Each candidate is
+    normalized once and blocked by author: titles are only scored against
+    kept candidates whose author is within the threshold, so merges are
+    the same as checking every pair with are_duplicates().
     Returns list with merged frequency scores.
     """
+    titles = [normalize_title(c.title) for c in candidates]
+    authors = [normalize_author(c.author) for c in candidates]
+    similar_authors = _similar_authors(authors, authors, threshold)
+
     unique: list[Candidate] = []
+    unique_titles: list[str] = []
+    exact: dict[tuple[str, str], int] = {}
+    unique_by_author: dict[str, list[int]] = defaultdict(list)
+
+    for candidate, title, author in zip(candidates, titles, authors):
+        # Earliest kept candidate that matches, exactly or fuzzily
+        match = exact.get((title, author))
+
+        block = [
+            i
+            for similar in similar_authors[author]
+            for i in unique_by_author.get(similar, ())
+        ]
+        if block:
+            hits = process.extract(
+                title,
+                [unique_titles[i] for i in block],
+                scorer=fuzz.token_sort_ratio,
+                score_cutoff=threshold,
+                limit=None,
+            )
+            for _, _, position in hits:
+                if match is None or block[position] < match:
+                    match = block[position]
 
-    for candidate in candidates:
-        found = False
-        for existing in unique:
-            if are_duplicates(
-                candidate.title,
-                candidate.author,
-                existing.title,
-                existing.author,
-            ):
-                # Merge into existing
-                existing.sources.extend(candidate.sources)
-                existing.frequency_score += candidate.frequency_score
-                found = True
-                break
-
-        if not found:
+        if match is None:
+            exact[(title, author)] = len(unique)
+            unique_by_author[author].append(len(unique))
             unique.append(candidate)
+            unique_titles.append(title)
+        else:
+            # Merge into existing
+            existing = unique[match]
+            existing.sources.extend(candidate.sources)
+            existing.frequency_score += candidate.frequency_score
 
     return unique
 
 
-def load_already_read(csv_path: Path = READ_BOOKS_CSV) -> set[str]:
+def _similar_authors(
+    queries: list[str],
+    choices: list[str],
+    threshold: int,
+) -> dict[str, list[str]]:
     """
-    Load already-read books as normalized keys.
+    Map each distinct query author to the choice authors it fuzzy-matches.
 
-    Returns set of normalized (title|author) keys.
+    Scores distinct queries against distinct choices with batched
+    rapidfuzz cdist calls, chunked to bound memory.
+    """
+    distinct_queries = list(dict.fromkeys(queries))
+    distinct_choices = list(dict.fromkeys(choices))
+    similar: dict[str, list[str]] = {author: [] for author in distinct_queries}
+    if not distinct_choices:
+        return similar
+
+    for start in range(0, len(distinct_queries), _AUTHOR_BLOCK_CHUNK_SIZE):
+        chunk = distinct_queries[start : start + _AUTHOR_BLOCK_CHUNK_SIZE]
+        scores = process.cdist(
+            chunk,
+            distinct_choices,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=threshold,
+            workers=-1,
+        )
+        rows, cols = (scores >= threshold).nonzero()
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            similar[chunk[row]].append(distinct_choices[col])
+
+    return similar
+
+
+@dataclass
+class ReadBooks:
+    """Already-read books as Goodreads IDs and normalized (title|author) keys."""
+
+    ids: set[str] = field(default_factory=set)
+    keys: set[str] = field(default_factory=set)
+
+
+def load_read_books(csv_path: Path = READ_BOOKS_CSV) -> ReadBooks:
     """
-    read_books = set()
+    Load already-read books, using a cached sidecar when it's current.
 
+    The sidecar sits next to the CSV and is keyed on the CSV's mtime and
+    size, so the CSV (and its long review column) is only re-parsed
+    after it changes.
+    """
     if not csv_path.exists():
-        return read_books
+        return ReadBooks()
+
+    stat = csv_path.stat()
+    stamp = (_READ_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_path = _read_cache_path(csv_path)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["stamp"] == stamp:
+            return ReadBooks(ids=cached["ids"], keys=cached["keys"])
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+        pass
+
+    read_books = _parse_read_books(csv_path)
+
+    try:
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"stamp": stamp, "ids": read_books.ids, "keys": read_books.keys},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Caching is best-effort
+
+    return read_books
+
+
+def _parse_read_books(csv_path: Path) -> ReadBooks:
+    """Parse the read-books CSV into IDs and normalized keys."""
+    read_books = ReadBooks()
 
     with open(csv_path, encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            if gid := row.get("goodreads_id"):
+                read_books.ids.add(str(gid))
             title = row.get("title", "")
             author = row.get("author", "")
             if title and author:
-                read_books.add(normalize_key(title, author))
+                read_books.keys.add(normalize_key(title, author))
 
     return read_books
 
 
+def _read_cache_path(csv_path: Path) -> Path:
+    """Return the sidecar cache path for a read-books CSV."""
+    return csv_path.with_name(f".{csv_path.name}.cache")
+
+
+def load_already_read(csv_path: Path = READ_BOOKS_CSV) -> set[str]:
+    """
+    Load already-read books as normalized keys.
+
+    Returns set of normalized (title|author) keys.
+    """
+    return load_read_books(csv_path).keys
+
+
+class ReadBooksIndex:
+    """
+    Already-read books prepared for fast duplicate lookups.
+
+    Holds normalized titles and authors side by side, with exact lookups
+    through the key set and fuzzy lookups blocked by author.
+    """
+
+    def __init__(
+        self,
+        read_keys: set[str],
+        threshold: int = READ_MATCH_THRESHOLD,
+    ):
+        self.keys = set(read_keys)
+        self.threshold = threshold
+        self.titles: list[str] = []
+        self.authors: list[str] = []
+        self._by_author: dict[str, list[int]] = defaultdict(list)
+
+        for key in sorted(self.keys):
+            title, author = key.split("|", 1)
+            self._by_author[author].append(len(self.titles))
+            self.titles.append(title)
+            self.authors.append(author)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def match(self, title: str, author: str) -> Optional[str]:
+        """Return the matching read title, or None if the book is unread."""
+        return self.match_many([(title, author)])[0]
+
+    def match_many(self, books: list[tuple[str, str]]) -> list[Optional[str]]:
+        """
+        Match many (title, author) pairs against the read list at once.
+
+        Returns the matching read title for each pair, or None if unread.
+        """
+        titles = [normalize_title(title) for title, _ in books]
+        authors = [normalize_author(author) for _, author in books]
+        similar_authors = _similar_authors(authors, self.authors, self.threshold)
+
+        matches: list[Optional[str]] = []
+        for title, author in zip(titles, authors):
+            if f"{title}|{author}" in self.keys:
+                matches.append(title)
+                continue
+
+            block = [
+                i
+                for similar in similar_authors[author]
+                for i in self._by_author[similar]
+            ]
+            hit = None
+            if block:
+                hit = process.extractOne(
+                    title,
+                    [self.titles[i] for i in block],
+                    scorer=fuzz.token_sort_ratio,
+                    score_cutoff=self.threshold,
+                )
+            matches.append(hit[0] if hit else None)
+
+        return matches
+
+
 def filter_already_read(
     candidates: list[Candidate],
-    read_books: Optional[set[str]] = None,
+    read_books: Optional[set[str] | ReadBooksIndex] = None,
 ) -> list[Candidate]:
     """
     Filter out books the user has already read.
 
-    Uses fuzzy matching against the read_books set.
+    Uses exact and fuzzy matching against a ReadBooksIndex (built from
+    the read_books key set if one isn't passed in).
     """
     if read_books is None:
         read_books = load_already_read()
+    if not isinstance(read_books, ReadBooksIndex):
+        read_books = ReadBooksIndex(read_books)
 
-    filtered = []
-    for candidate in candidates:
-        # Check exact match first
-        if candidate.normalized_key in read_books:
-            continue
-
-        # Check fuzzy match against all read books
-        is_read = False
-        for read_key in read_books:
-            read_title, read_author = read_key.split("|", 1)
-            if are_duplicates(
-                candidate.title,
-                candidate.author,
-                read_title,
-                read_author,
-                threshold=90,  # Higher threshold for read books
-            ):
-                is_read = True
-                break
-
-        if not is_read:
-            filtered.append(candidate)
-
-    return filtered
+    # Check exact match first
+    remaining = [c for c in candidates if c.normalized_key not in read_books]
+
+    matches = read_books.match_many([(c.title, c.author) for c in remaining])
+    return [c for c, match in zip(remaining, matches) if match is None]
 
 
 def filter_blacklisted_authors(
@@ -260,7 +463,7 @@ def score_candidates(
 
 def process_candidates(
     candidates: list[Candidate],
-    read_books: Optional[set[str]] = None,
+    read_books: Optional[set[str] | ReadBooksIndex] = None,
 ) -> list[Candidate]:
     """
     Run the full candidate processing pipeline:
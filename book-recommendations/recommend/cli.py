@@ -4,24 +4,34 @@ import argparse
 import sys
 from pathlib import Path
 
-from .config import LIBRARY_DIR, TOP_CANDIDATES_FOR_REVIEW, REVIEWS_PER_STAR_RATING
+from goodreads.fetch import DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL, ResponseCache
+
+from .config import (
+    LIBRARY_DIR,
+    REVIEWS_PER_STAR_RATING,
+    TOP_CANDIDATES_FOR_REVIEW,
+)
+from .aggregate import CandidateAggregator
+from .benchmark import FIXTURE_CORPUS, load_corpus, load_library_corpus, run_benchmark
 from .library import BookLibrary
-from .candidates import load_already_read, normalize_title, normalize_author
+from .candidates import ReadBooksIndex, load_already_read, normalize_key
 from .report import generate_report, generate_status_report
+from .storage import BACKENDS, migrate_library
 from .scrape import get_book_one, scrape_candidates as scrape_metadata_batch
 from .scrape_playwright import scrape_reviews_batch
 
 
 def cmd_status(args: argparse.Namespace) -> int:
     """Show current pipeline status."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
     print(generate_status_report(library))
     return 0
 
 
 def cmd_scrape_candidates(args: argparse.Namespace) -> int:
     """Scrape metadata and reviews for top candidates."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
+    cache = ResponseCache(DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL)
 
     # Get candidates needing scraping
     need_meta = library.get_books_needing_metadata()
@@ -34,8 +44,9 @@ def cmd_scrape_candidates(args: argparse.Namespace) -> int:
             return 0
 
         print(f"Scraping metadata for {len(ids)} candidates...")
-        count = scrape_metadata_batch(library, ids, fetch_reviews=False)
+        count = scrape_metadata_batch(library, ids, fetch_reviews=False, cache=cache)
         print(f"Successfully scraped metadata for {count} books.")
+        print(cache.summary())
         return 0
 
     # Full scrape: metadata first (fast, async), then reviews (Playwright)
@@ -49,7 +60,8 @@ def cmd_scrape_candidates(args: argparse.Namespace) -> int:
     meta_ids = [gid for gid in all_ids if gid in need_meta]
     if meta_ids:
         print(f"Scraping metadata for {len(meta_ids)} candidates...")
-        scrape_metadata_batch(library, meta_ids, fetch_reviews=False)
+        scrape_metadata_batch(library, meta_ids, fetch_reviews=False, cache=cache)
+        print(cache.summary())
 
     # Step 2: Reviews via Playwright (balanced 1★, 3★, 5★)
     review_ids = [gid for gid in all_ids if not library.has_reviews(gid)]
@@ -60,8 +72,9 @@ def cmd_scrape_candidates(args: argparse.Namespace) -> int:
             target_stars=[5, 3, 1],
             reviews_per_rating=REVIEWS_PER_STAR_RATING,
         )
-        for gid, reviews in results.items():
-            library.add_reviews(gid, reviews)
+        with library.batch():
+            for gid, reviews in results.items():
+                library.add_reviews(gid, reviews)
         print(f"Successfully scraped reviews for {len(results)} books.")
 
     print(f"Done. Scraped {len(all_ids)} candidates.")
@@ -70,7 +83,7 @@ def cmd_scrape_candidates(args: argparse.Namespace) -> int:
 
 def cmd_generate_report(args: argparse.Namespace) -> int:
     """Generate recommendations report."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
 
     books = library.get_books_with_recommendations()
     if not books:
@@ -85,7 +98,7 @@ def cmd_generate_report(args: argparse.Namespace) -> int:
 
 def cmd_list_candidates(args: argparse.Namespace) -> int:
     """List all candidates in the library."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
 
     books = library.get_all_books()
     if not books:
@@ -119,7 +132,7 @@ def cmd_list_candidates(args: argparse.Namespace) -> int:
 
 def cmd_list_ready(args: argparse.Namespace) -> int:
     """List candidates ready for analysis (have reviews, no recommendation yet)."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
 
     ids = library.get_books_needing_analysis()
     if not ids:
@@ -140,8 +153,8 @@ def cmd_list_ready(args: argparse.Namespace) -> int:
 
 def cmd_check_read(args: argparse.Namespace) -> int:
     """Check if a book has already been read."""
-    read_books = load_already_read()
-    query = normalize_title(args.title) + "|" + normalize_author(args.author)
+    read_books = ReadBooksIndex(load_already_read())
+    query = normalize_key(args.title, args.author)
 
     # Exact match
     if query in read_books:
@@ -149,12 +162,10 @@ def cmd_check_read(args: argparse.Namespace) -> int:
         return 1
 
     # Fuzzy check
-    from .candidates import are_duplicates
-    for read_key in read_books:
-        read_title, read_author = read_key.split("|", 1)
-        if are_duplicates(args.title, args.author, read_title, read_author, threshold=90):
-            print(f"YES - already read (matched: {read_title})")
-            return 1
+    matched = read_books.match(args.title, args.author)
+    if matched is not None:
+        print(f"YES - already read (matched: {matched})")
+        return 1
 
     print("NO - not in read list")
     return 0
@@ -164,7 +175,9 @@ def cmd_check_series(args: argparse.Namespace) -> int:
     """Check if a book is part of a series and find Book 1."""
     print(f"Checking {args.id}...", file=sys.stderr)
 
-    result = get_book_one(args.id)
+    result = get_book_one(
+        args.id, ResponseCache(DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL)
+    )
 
     if result is None:
         print("Not part of a series, or already Book 1.")
@@ -174,7 +187,7 @@ def cmd_check_series(args: argparse.Namespace) -> int:
     print(f"ID: {result.get('goodreads_id')}")
 
     if args.add:
-        library = BookLibrary(Path(args.library))
+        library = BookLibrary(Path(args.library), args.backend)
         library.add_candidate(
             goodreads_id=result["goodreads_id"],
             title=result["title"],
@@ -188,7 +201,7 @@ def cmd_check_series(args: argparse.Namespace) -> int:
 
 def cmd_add_candidate(args: argparse.Namespace) -> int:
     """Manually add a candidate to the library."""
-    library = BookLibrary(Path(args.library))
+    library = BookLibrary(Path(args.library), args.backend)
 
     library.add_candidate(
         goodreads_id=args.id,
@@ -201,6 +214,52 @@ def cmd_add_candidate(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """Copy the library into the SQLite backend."""
+    try:
+        counts = migrate_library(Path(args.library), "sqlite")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Migrated {counts['books']} books and {counts['searches']} searches to SQLite.")
+    print("The original JSON files were left in place.")
+    return 0
+
+
+def cmd_aggregate(args: argparse.Namespace) -> int:
+    """Merge candidates from cached searches made since the last run."""
+    library = BookLibrary(Path(args.library), args.backend)
+    aggregator = CandidateAggregator(library)
+    processed = aggregator.update()
+
+    candidates = aggregator.candidates()
+    print(f"Processed {processed} new searches; {len(candidates)} candidates in pool.")
+
+    if candidates and args.top:
+        print()
+        print(f"{'Title':<40} {'Author':<25} {'Score':>6}")
+        print("-" * 73)
+        for c in candidates[: args.top]:
+            print(f"{c.title[:38]:<40} {c.author[:23]:<25} {c.frequency_score:>6.1f}")
+    return 0
+
+
+def cmd_benchmark_extract(args: argparse.Namespace) -> int:
+    """Benchmark book/author extraction from search results."""
+    if args.from_library:
+        results = load_library_corpus(BookLibrary(Path(args.library), args.backend))
+    else:
+        results = load_corpus(Path(args.corpus))
+
+    if not results:
+        print("No search results to benchmark.")
+        return 1
+
+    print(run_benchmark(results, repeat=args.repeat))
+    return 0
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -213,6 +272,12 @@ def main() -> int:
         default=str(LIBRARY_DIR),
         help="Path to library directory",
     )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="Library storage backend (default: sqlite if library.db exists, else json)",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -300,6 +365,49 @@ def main() -> int:
     read_parser.add_argument("author", help="Author name")
     read_parser.set_defaults(func=cmd_check_read)
 
+    # migrate command
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Move the library from JSON files into a single SQLite database",
+    )
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    # aggregate command
+    aggregate_parser = subparsers.add_parser(
+        "aggregate",
+        help="Merge candidates from searches cached since the last run",
+    )
+    aggregate_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Candidates to list, by score (default: 20)",
+    )
+    aggregate_parser.set_defaults(func=cmd_aggregate)
+
+    # benchmark-extract command
+    bench_parser = subparsers.add_parser(
+        "benchmark-extract",
+        help="Measure book/author extraction speed and yield on search results",
+    )
+    bench_parser.add_argument(
+        "--corpus",
+        default=str(FIXTURE_CORPUS),
+        help="JSONL file of cached searches (default: bundled fixture corpus)",
+    )
+    bench_parser.add_argument(
+        "--from-library",
+        action="store_true",
+        help="Use every search cached in the library instead of --corpus",
+    )
+    bench_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Passes over the corpus when timing (default: 20)",
+    )
+    bench_parser.set_defaults(func=cmd_benchmark_extract)
+
     args = parser.parse_args()
     return args.func(args)
 
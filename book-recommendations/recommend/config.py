@@ -16,6 +16,9 @@ USER_PROFILE_MD = BASE_DIR / "user_profile.md"
 SIMILAR_BOOK_SEARCHES_PER_FAVORITE = 2
 MAX_STYLE_SEARCHES = 10
 SEARCH_MAX_RESULTS = 10
+SEARCH_WORKERS = 4  # Searches in flight at once
+SEARCH_DELAY_SECONDS = 1.0  # Minimum gap between search starts
+SEARCH_CACHE_TTL_DAYS = 90  # Cached searches older than this are rerun
 
 # Candidate settings
 MIN_FREQUENCY_SCORE = 1
@@ -23,13 +26,25 @@ TOP_CANDIDATES_FOR_REVIEW = 50
 
 # Scraping settings
 REVIEWS_PER_STAR_RATING = 3
-SCRAPE_DELAY_SECONDS = 1.5
 MAX_CONCURRENT_REQUESTS = 5
 MAX_RETRIES = 3
+# HTML parse workers, request rate limits, and the HTTP cache directory and
+# TTL are shared with goodreads genres; see goodreads.parsing and
+# goodreads.fetch
+
+# Library settings
+LIBRARY_BATCH_SIZE = 100  # Pending changes before a batch flushes early
+LIBRARY_CACHE_SIZE = 1000  # Book records kept in memory (0 disables)
 
 # Fuzzy matching threshold for deduplication (0-100)
 FUZZY_MATCH_THRESHOLD = 85
 
+# Max distinct titles/authors memoized by the normalizers
+NORMALIZE_CACHE_SIZE = 65536
+
+# Stricter threshold when matching candidates against already-read books
+READ_MATCH_THRESHOLD = 90
+
 # Authors to avoid (from user profile)
 AVOID_AUTHORS = [
     "M.R. Carey",
@@ -0,0 +1,131 @@
+"""Extract book titles and authors from search results.
+
+Patterns are compiled once and tried in order, most specific first:
+Goodreads and Amazon page titles, then numbered listicle entries in
+snippets, then the generic "Title by Author" form over the title and
+snippet together and "Author - Title" in the title. The first pattern
+that matches wins.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+# Goodreads book pages: "Title (Series, #1) by Author | Goodreads"
+_GOODREADS_RE = re.compile(r"^(?P<book>.+?)\s+by\s+(?P<author>[^|]+?)\s*\|\s*Goodreads")
+
+# Amazon product pages, in both of Amazon's title layouts:
+# "Title: Last, First: 9780756404741: Amazon.com: Books"
+# "Amazon.com: Title: 9780756404741: Last, First: Books"
+_AMAZON_RE = re.compile(
+    r"^(?!Amazon\.com)(?P<book>.+?):\s*(?P<author>[^:]+?):\s*[\dX]{10,13}:\s*Amazon\."
+)
+_AMAZON_STORE_FIRST_RE = re.compile(
+    r"^Amazon\.com:\s*(?P<book>.+?):\s*[\dX]{10,13}:\s*(?P<author>[^:]+?):\s*Books"
+)
+
+# Numbered list entries in snippets: "3. The Hobbit by J.R.R. Tolkien"
+_LISTICLE_RE = re.compile(
+    r"(?:^|\s)\d{1,2}[.)]\s+[\"“]?(?P<book>[A-Z][^\"”\n]{0,80}?)[\"”]?"
+    r"\s+by\s+(?P<author>[A-Z][\w.'’-]*(?:\s+[A-Z][\w.'’-]*){0,3})"
+)
+# A sentence ending inside a listicle author: "Erin Morgenstern. A ..."
+_SENTENCE_END_RE = re.compile(r"(?<=[a-z]{2})\.(?:\s.*)?$")
+
+# Generic forms over title + snippet
+_BY_RE = re.compile(
+    r'"?([^"]+)"?\s+by\s+([A-Z][a-zA-Z\.\s]+?)(?:\s*[-–—]|\s*\||\s*$)',
+    re.IGNORECASE,
+)
+_AUTHOR_FIRST_RE = re.compile(r"([A-Z][a-zA-Z\.\s]+?)\s*[-–—:]\s*([^,\|]+)")
+# Cheap check that lets most results skip the backtracking-heavy _BY_RE
+_BY_WORD_RE = re.compile(r"\sby\s", re.IGNORECASE)
+
+# Series notation left in extracted titles: "(The Kingkiller Chronicle, #1)"
+_SERIES_RE = re.compile(r"\s*\([^)]*#\d+[^)]*\)")
+
+
+@dataclass
+class Extraction:
+    """A book and author found in a search result, and the pattern that found it."""
+
+    book: Optional[str]
+    author: Optional[str]
+    pattern: Optional[str] = None
+
+
+def _flip_name(author: str) -> str:
+    """Turn Amazon's "Last, First" into "First Last"."""
+    parts = [p.strip() for p in author.split(",")]
+    if len(parts) >= 2 and parts[0] and parts[1]:
+        return f"{parts[1]} {parts[0]}"
+    return author.strip()
+
+
+def _goodreads(title: str, snippet: str, text: str) -> Optional[tuple[str, str]]:
+    match = _GOODREADS_RE.search(title)
+    if match:
+        return match.group("book"), match.group("author")
+    return None
+
+
+def _amazon(title: str, snippet: str, text: str) -> Optional[tuple[str, str]]:
+    match = _AMAZON_RE.search(title) or _AMAZON_STORE_FIRST_RE.search(title)
+    if match:
+        return match.group("book"), _flip_name(match.group("author"))
+    return None
+
+
+def _listicle(title: str, snippet: str, text: str) -> Optional[tuple[str, str]]:
+    match = _LISTICLE_RE.search(snippet)
+    if match:
+        author = _SENTENCE_END_RE.sub("", match.group("author"))
+        return match.group("book"), author.rstrip(",;:")
+    return None
+
+
+def _title_by_author(title: str, snippet: str, text: str) -> Optional[tuple[str, str]]:
+    if not _BY_WORD_RE.search(text):
+        return None
+    match = _BY_RE.search(text)
+    if match:
+        return match.group(1).strip().strip('"'), match.group(2)
+    return None
+
+
+def _author_first(title: str, snippet: str, text: str) -> Optional[tuple[str, str]]:
+    # Title only: over title + snippet the book runs on into the snippet
+    match = _AUTHOR_FIRST_RE.search(title)
+    if match:
+        author = match.group(1).strip()
+        # Only accept if author looks like a name (2-4 words)
+        if 2 <= len(author.split()) <= 4:
+            return match.group(2).strip().strip('"'), author
+    return None
+
+
+# Tried in order; each takes (title, snippet, title + " " + snippet)
+PATTERNS: list[tuple[str, Callable[[str, str, str], Optional[tuple[str, str]]]]] = [
+    ("goodreads", _goodreads),
+    ("amazon", _amazon),
+    ("listicle", _listicle),
+    ("title_by_author", _title_by_author),
+    ("author_first", _author_first),
+]
+
+
+def extract(title: str, snippet: str, patterns=PATTERNS) -> Extraction:
+    """Extract a book and author from one search result."""
+    text = f"{title} {snippet}"
+    for name, pattern in patterns:
+        found = pattern(title, snippet, text)
+        if found:
+            book, author = found
+            book = _SERIES_RE.sub("", book.strip().strip('"“”'))
+            return Extraction(book, author.strip(), name)
+    return Extraction(None, None)
+
+
+def extract_many(results: Iterable[dict], patterns=PATTERNS) -> list[Extraction]:
+    """Extract books and authors from search result dicts (title/snippet)."""
+    return [extract(r.get("title", ""), r.get("snippet", ""), patterns) for r in results]
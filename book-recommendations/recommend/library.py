@@ -1,34 +1,112 @@
 """Persistent data library for book recommendations.
 
-Provides a JSON-based cache for books, searches, and metadata.
+Provides a local cache for books, searches, and metadata, stored either
+as JSON files or in a single SQLite database (see storage.py).
 Once data is fetched, it's stored locally to avoid re-fetching.
 """
 
-import csv
-import json
-from datetime import datetime, timezone
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
 
-from .config import LIBRARY_DIR, READ_BOOKS_CSV
+from .candidates import load_read_books
+from .config import (
+    LIBRARY_BATCH_SIZE,
+    LIBRARY_CACHE_SIZE,
+    LIBRARY_DIR,
+    READ_BOOKS_CSV,
+    SEARCH_CACHE_TTL_DAYS,
+)
+from .storage import FLAG_FIELDS, open_store, search_key
+
+# Pipeline stages, and which index entries still need each one
+STAGE_PREDICATES = {
+    "metadata": lambda info: not info.get("has_metadata"),
+    "reviews": lambda info: info.get("has_metadata") and not info.get("has_reviews"),
+    "analysis": lambda info: info.get("has_reviews") and not info.get("has_analysis"),
+}
+
+
+class RecordCache:
+    """Least-recently-used cache of book records, keyed by goodreads_id."""
+
+    def __init__(self, capacity: int = LIBRARY_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._records: OrderedDict[str, dict] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, goodreads_id: str) -> Optional[dict]:
+        """Return a cached record (marking it recently used), or None."""
+        record = self._records.get(goodreads_id)
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._records.move_to_end(goodreads_id)
+        return record
+
+    def put(self, goodreads_id: str, record: dict) -> None:
+        """Cache a record, evicting the least recently used beyond capacity."""
+        if self.capacity <= 0:
+            return
+        self._records[goodreads_id] = record
+        self._records.move_to_end(goodreads_id)
+        while len(self._records) > self.capacity:
+            self._records.popitem(last=False)
+
+    def info(self) -> dict:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._records),
+            "capacity": self.capacity,
+        }
 
 
 class BookLibrary:
     """Interface for the book data library."""
 
-    def __init__(self, path: Path = LIBRARY_DIR):
+    def __init__(
+        self,
+        path: Path = LIBRARY_DIR,
+        backend: Optional[str] = None,
+        cache_size: int = LIBRARY_CACHE_SIZE,
+    ):
+        """
+        Open the library at path.
+
+        backend is "json" or "sqlite"; by default a library with a
+        library.db uses SQLite and any other library uses JSON files.
+        cache_size is how many book records to keep in memory.
+        """
         self.path = path
-        self.books_dir = path / "books"
-        self.searches_dir = path / "searches"
-        self.index_path = path / "index.json"
-
-        # Ensure directories exist
-        self.books_dir.mkdir(parents=True, exist_ok=True)
-        self.searches_dir.mkdir(parents=True, exist_ok=True)
-
+        self.store = open_store(path, backend)
         self.index = self._load_index()
+        self.cache = RecordCache(cache_size)
+        self.search_ttl = timedelta(days=SEARCH_CACHE_TTL_DAYS)
         self._already_read: Optional[set[str]] = None
 
+        # Writes deferred by batch()
+        self._batch_depth = 0
+        self._batch_size = LIBRARY_BATCH_SIZE
+        self._pending_books: dict[str, dict] = {}
+        self._pending_index: set[str] = set()
+
+        # Secondary indexes over self.index, kept current by _save_index
+        self._position: dict[str, int] = {}
+        self._with_flag: dict[str, set[str]] = {f: set() for f in FLAG_FIELDS}
+        self._needing: dict[str, set[str]] = {s: set() for s in STAGE_PREDICATES}
+        self._by_tier: dict[str, set[str]] = {}
+        for gid in self.index["books"]:
+            self._update_secondary_indexes(gid)
+
     # === QUERIES ===
 
     def has_book(self, goodreads_id: str) -> bool:
@@ -54,85 +132,123 @@ class BookLibrary:
         return goodreads_id in self._already_read
 
     def get_book(self, goodreads_id: str) -> Optional[dict]:
-        """Load full book record from disk."""
-        path = self.books_dir / f"{goodreads_id}.json"
-        if path.exists():
-            return json.loads(path.read_text())
-        return None
+        """
+        Load full book record, from memory when possible.
+
+        Records are cached and shared between callers, so changes should
+        go through the add_*/set_* methods rather than editing them.
+        """
+        if goodreads_id in self._pending_books:
+            return self._pending_books[goodreads_id]
+
+        book = self.cache.get(goodreads_id)
+        if book is None:
+            book = self.store.load_book(goodreads_id)
+            if book is not None:
+                self.cache.put(goodreads_id, book)
+        return book
 
     def get_all_books(self) -> list[dict]:
-        """Load all book records from disk."""
-        books = []
-        for gid in self.index["books"]:
-            book = self.get_book(gid)
-            if book:
-                books.append(book)
-        return books
+        """Load all book records."""
+        return self._get_books(list(self.index["books"]))
 
     def get_books_needing_metadata(self) -> list[str]:
         """Return goodreads_ids of books that need metadata fetching."""
-        return [
-            gid
-            for gid, info in self.index["books"].items()
-            if not info.get("has_metadata")
-        ]
+        return self._in_index_order(self._needing["metadata"])
 
     def get_books_needing_reviews(self) -> list[str]:
         """Return goodreads_ids of books that need review scraping."""
-        return [
-            gid
-            for gid, info in self.index["books"].items()
-            if info.get("has_metadata") and not info.get("has_reviews")
-        ]
+        return self._in_index_order(self._needing["reviews"])
 
     def get_books_needing_analysis(self) -> list[str]:
         """Return goodreads_ids of books that have reviews but no analysis."""
-        return [
-            gid
-            for gid, info in self.index["books"].items()
-            if info.get("has_reviews") and not info.get("has_analysis")
-        ]
+        return self._in_index_order(self._needing["analysis"])
+
+    def get_books_by_tier(self, tier: str) -> list[str]:
+        """Return goodreads_ids of books recommended at the given tier."""
+        return self._in_index_order(self._by_tier.get(tier, set()))
 
     def get_books_with_recommendations(self) -> list[dict]:
         """Return all books that have recommendations."""
-        return [
-            self.get_book(gid)
-            for gid, info in self.index["books"].items()
-            if info.get("has_recommendation") and self.get_book(gid)
-        ]
+        return self._get_books(
+            self._in_index_order(self._with_flag["has_recommendation"])
+        )
 
     # === SEARCH CACHING ===
 
-    def get_cached_search(self, search_type: str, query_slug: str) -> Optional[dict]:
-        """Get cached search results if available."""
-        path = self.searches_dir / search_type / f"{query_slug}.json"
-        if path.exists():
-            return json.loads(path.read_text())
+    def get_cached_search(self, search_type: str, query: str) -> Optional[dict]:
+        """Get cached search results for a query, unless missing or expired."""
+        data = self.store.load_search(search_type, search_key(query))
+        if data and self._search_is_fresh(data):
+            return data
         return None
 
-    def cache_search(self, search_type: str, query_slug: str, query: str, results: list) -> None:
-        """Cache search results."""
-        search_dir = self.searches_dir / search_type
-        search_dir.mkdir(parents=True, exist_ok=True)
-
+    def cache_search(
+        self, search_type: str, query: str, results: list, seed: str = ""
+    ) -> None:
+        """Cache search results, with the seed book for similar searches."""
         data = {
             "query": query,
             "searched_at": _now_iso(),
             "results": results,
         }
-        path = search_dir / f"{query_slug}.json"
-        path.write_text(json.dumps(data, indent=2))
+        if seed:
+            data["seed"] = seed
+        self.store.save_search(search_type, search_key(query), data)
 
     def get_all_cached_searches(self, search_type: str) -> list[dict]:
-        """Get all cached searches of a given type."""
-        search_dir = self.searches_dir / search_type
-        if not search_dir.exists():
-            return []
+        """Get all unexpired cached searches of a given type."""
+        return [
+            data
+            for data in self.store.load_searches(search_type)
+            if self._search_is_fresh(data)
+        ]
+
+    def _search_is_fresh(self, data: dict) -> bool:
+        """Check whether a cached search is younger than the search TTL."""
+        try:
+            searched_at = datetime.fromisoformat(data["searched_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now(timezone.utc) - searched_at < self.search_ttl
+
+    # === BATCHING ===
+
+    @contextmanager
+    def batch(self, size: int = LIBRARY_BATCH_SIZE):
+        """
+        Defer book and index writes until the block exits.
+
+        Repeated writes to the same book are coalesced, and everything is
+        flushed in one store transaction at the end, or early once `size`
+        changes are pending. Pending writes are flushed even if the block
+        raises, so an interrupted scrape keeps its progress. Batches nest;
+        only the outermost one flushes on exit.
+        """
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._batch_size = size
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write any pending batched changes to disk."""
+        if not self._pending_books and not self._pending_index:
+            return
+
+        books, self._pending_books = self._pending_books, {}
+        changed_ids, self._pending_index = self._pending_index, set()
 
-        searches = []
-        for path in search_dir.glob("*.json"):
-            searches.append(json.loads(path.read_text()))
-        return searches
+        with self.store.transaction():
+            # Books first, so the index never points at a missing record
+            for gid, book in books.items():
+                self.store.save_book(gid, book)
+            if changed_ids:
+                self.store.save_index(self.index, changed_ids)
 
     # === UPDATES ===
 
@@ -169,7 +285,7 @@ class BookLibrary:
                 "has_recommendation": False,
                 "tier": None,
             }
-            self._save_index()
+            self._save_index(goodreads_id)
 
     def add_metadata(self, goodreads_id: str, metadata: dict) -> None:
         """Add metadata to an existing book record."""
@@ -185,7 +301,7 @@ class BookLibrary:
 
         self._save_book(goodreads_id, book)
         self.index["books"][goodreads_id]["has_metadata"] = True
-        self._save_index()
+        self._save_index(goodreads_id)
 
     def add_reviews(self, goodreads_id: str, reviews: dict) -> None:
         """Add scraped reviews to an existing book record."""
@@ -196,7 +312,7 @@ class BookLibrary:
         book["reviews"] = {**reviews, "fetched_at": _now_iso()}
         self._save_book(goodreads_id, book)
         self.index["books"][goodreads_id]["has_reviews"] = True
-        self._save_index()
+        self._save_index(goodreads_id)
 
     def add_analysis(self, goodreads_id: str, analysis: dict) -> None:
         """Add LLM analysis to an existing book record."""
@@ -207,7 +323,7 @@ class BookLibrary:
         book["analysis"] = {**analysis, "generated_at": _now_iso()}
         self._save_book(goodreads_id, book)
         self.index["books"][goodreads_id]["has_analysis"] = True
-        self._save_index()
+        self._save_index(goodreads_id)
 
     def set_recommendation(
         self,
@@ -232,52 +348,105 @@ class BookLibrary:
         self._save_book(goodreads_id, book)
         self.index["books"][goodreads_id]["has_recommendation"] = True
         self.index["books"][goodreads_id]["tier"] = tier
-        self._save_index()
+        self._save_index(goodreads_id)
 
     # === STATUS ===
 
     def get_status(self) -> dict:
         """Get current pipeline status."""
-        books = self.index["books"]
         return {
-            "total_candidates": len(books),
-            "with_metadata": sum(1 for b in books.values() if b.get("has_metadata")),
-            "with_reviews": sum(1 for b in books.values() if b.get("has_reviews")),
-            "with_analysis": sum(1 for b in books.values() if b.get("has_analysis")),
-            "with_recommendation": sum(1 for b in books.values() if b.get("has_recommendation")),
-            "needing_metadata": len(self.get_books_needing_metadata()),
-            "needing_reviews": len(self.get_books_needing_reviews()),
-            "needing_analysis": len(self.get_books_needing_analysis()),
+            "total_candidates": len(self.index["books"]),
+            "with_metadata": len(self._with_flag["has_metadata"]),
+            "with_reviews": len(self._with_flag["has_reviews"]),
+            "with_analysis": len(self._with_flag["has_analysis"]),
+            "with_recommendation": len(self._with_flag["has_recommendation"]),
+            "needing_metadata": len(self._needing["metadata"]),
+            "needing_reviews": len(self._needing["reviews"]),
+            "needing_analysis": len(self._needing["analysis"]),
         }
 
+    def cache_info(self) -> dict:
+        """Return hit/miss statistics for the in-memory record cache."""
+        return self.cache.info()
+
     # === INTERNAL ===
 
+    def _get_books(self, goodreads_ids: list[str]) -> list[dict]:
+        """Load several records, reading only cache misses from the store."""
+        self.flush()
+
+        books = {}
+        for gid in goodreads_ids:
+            book = self.cache.get(gid)
+            if book is not None:
+                books[gid] = book
+
+        missing = [gid for gid in goodreads_ids if gid not in books]
+        if missing:
+            for gid, book in self.store.load_books(missing).items():
+                books[gid] = book
+                self.cache.put(gid, book)
+
+        return [books[gid] for gid in goodreads_ids if gid in books]
+
     def _save_book(self, goodreads_id: str, book: dict) -> None:
-        """Save a book record to disk."""
-        path = self.books_dir / f"{goodreads_id}.json"
-        path.write_text(json.dumps(book, indent=2))
+        """Save a book record (write-through cache; deferred inside batch())."""
+        self.cache.put(goodreads_id, book)
+        if self._batch_depth:
+            self._pending_books[goodreads_id] = book
+            self._flush_if_full()
+        else:
+            self.store.save_book(goodreads_id, book)
 
-    def _save_index(self) -> None:
-        """Save the index to disk."""
+    def _save_index(self, goodreads_id: str) -> None:
+        """Save the index to disk after an entry changed (deferred inside batch())."""
+        self._update_secondary_indexes(goodreads_id)
         self.index["last_updated"] = _now_iso()
-        self.index_path.write_text(json.dumps(self.index, indent=2))
+        if self._batch_depth:
+            self._pending_index.add(goodreads_id)
+            self._flush_if_full()
+        else:
+            self.store.save_index(self.index, [goodreads_id])
+
+    def _flush_if_full(self) -> None:
+        """Flush a batch early once enough changes are pending."""
+        pending = len(self._pending_books) + len(self._pending_index)
+        if pending >= self._batch_size:
+            self.flush()
+
+    def _update_secondary_indexes(self, goodreads_id: str) -> None:
+        """Move a book between flag, stage and tier sets after its entry changed."""
+        info = self.index["books"][goodreads_id]
+        self._position.setdefault(goodreads_id, len(self._position))
+
+        for flag, ids in self._with_flag.items():
+            if info.get(flag):
+                ids.add(goodreads_id)
+            else:
+                ids.discard(goodreads_id)
+
+        for stage, ids in self._needing.items():
+            if STAGE_PREDICATES[stage](info):
+                ids.add(goodreads_id)
+            else:
+                ids.discard(goodreads_id)
+
+        for ids in self._by_tier.values():
+            ids.discard(goodreads_id)
+        if info.get("tier"):
+            self._by_tier.setdefault(info["tier"], set()).add(goodreads_id)
+
+    def _in_index_order(self, goodreads_ids: set[str]) -> list[str]:
+        """Sort a set of goodreads_ids into the order they were added."""
+        return sorted(goodreads_ids, key=self._position.__getitem__)
 
     def _load_index(self) -> dict:
         """Load the index from disk, or create a new one."""
-        if self.index_path.exists():
-            return json.loads(self.index_path.read_text())
-        return {"version": 1, "books": {}, "last_updated": _now_iso()}
+        return self.store.load_index()
 
     def _load_already_read(self) -> set[str]:
         """Load the set of already-read book IDs from the CSV."""
-        already_read = set()
-        if READ_BOOKS_CSV.exists():
-            with open(READ_BOOKS_CSV, encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if gid := row.get("goodreads_id"):
-                        already_read.add(str(gid))
-        return already_read
+        return load_read_books(READ_BOOKS_CSV).ids
 
 
 def _now_iso() -> str:
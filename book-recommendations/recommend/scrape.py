@@ -3,18 +3,36 @@
 import asyncio
 import random
 import re
+from concurrent.futures import Executor
 from typing import Optional
 
 import aiohttp
-from bs4 import BeautifulSoup
+from lxml import etree
 from tqdm.asyncio import tqdm
 
+from goodreads.fetch import (
+    DEFAULT_MAX_RATE,
+    DEFAULT_MIN_RATE,
+    DEFAULT_RATE,
+    RateLimiter,
+    ResponseCache,
+    fetch_html,
+)
+from goodreads.parsing import (
+    DEFAULT_PARSE_WORKERS,
+    first,
+    get_text,
+    parse_html,
+    parse_pool,
+    run_parser,
+)
+from goodreads.workers import run_worker_pool, summarize_workers
+
 from .config import (
     GOODREADS_BASE_URL,
     MAX_CONCURRENT_REQUESTS,
     MAX_RETRIES,
     REVIEWS_PER_STAR_RATING,
-    SCRAPE_DELAY_SECONDS,
     USER_AGENT,
 )
 from .library import BookLibrary
@@ -24,23 +42,30 @@ async def fetch_page(
     session: aiohttp.ClientSession,
     url: str,
     max_retries: int = MAX_RETRIES,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> Optional[str]:
     """
-    Fetch a page with exponential backoff on failure.
+    Fetch a page, paced by the rate limiter if there is one and with
+    exponential backoff on failure otherwise.
 
+    Pages come from the response cache when it has them.
     Returns None if all retries fail.
     """
     for attempt in range(max_retries):
         try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.text()
-                elif response.status == 429:
-                    # Rate limited
-                    wait = (2**attempt) + random.uniform(1, 3)
-                    await asyncio.sleep(wait)
-                else:
-                    await asyncio.sleep(0.5 * (attempt + 1))
+            status, html = await fetch_html(session, url, cache, limiter)
+            if status == 200:
+                return html
+            elif limiter and (status == 429 or status >= 500):
+                # The limiter has slowed down for everyone; just retry
+                continue
+            elif status == 429:
+                # Rate limited
+                wait = (2**attempt) + random.uniform(1, 3)
+                await asyncio.sleep(wait)
+            else:
+                await asyncio.sleep(0.5 * (attempt + 1))
         except (aiohttp.ClientError, asyncio.TimeoutError):
             wait = (2**attempt) * 0.5 + random.uniform(0, 0.5)
             await asyncio.sleep(wait)
@@ -48,75 +73,129 @@ async def fetch_page(
     return None
 
 
+def parse_book_page(
+    html: str,
+    target_stars: Optional[list[int]] = [5, 3, 1],
+) -> tuple[dict, Optional[dict]]:
+    """
+    Extract metadata and reviews from one parse of a Goodreads book page.
+
+    Pass target_stars=None to skip reviews. Returns (metadata, reviews).
+    """
+    tree = parse_html(html)
+    metadata = _metadata_from_tree(tree)
+    reviews = _reviews_from_tree(tree, target_stars) if target_stars else None
+    return metadata, reviews
+
+
 def parse_book_metadata(html: str) -> dict:
     """Extract metadata from a Goodreads book page."""
-    soup = BeautifulSoup(html, "lxml")
+    return _metadata_from_tree(parse_html(html))
+
+
+# Book page selectors
+_TITLE = etree.XPath('//h1[@data-testid="bookTitle"]')
+_AUTHOR = etree.XPath('//span[@data-testid="name"]')
+_GENRE_LINKS = etree.XPath(
+    '//*[@data-testid="genresList"]//a[contains(@href, "/genres/")]'
+)
+_RATING = etree.XPath('//div[contains(@class, "RatingStatistics__rating")]')
+_RATINGS_COUNT = etree.XPath('//span[@data-testid="ratingsCount"]')
+_PAGES = etree.XPath('//p[@data-testid="pagesFormat"]')
+_PUBLICATION = etree.XPath('//p[@data-testid="publicationInfo"]')
+_DESCRIPTION = etree.XPath('//div[@data-testid="description"]')
+_SERIES_LINK = etree.XPath(
+    '//h3[contains(@class, "Text__title3")]//a[contains(@href, "/series/")]'
+)
+_SPANS = etree.XPath(".//span")
+
+# Review card selectors (relative to a card)
+_REVIEW_CARDS = etree.XPath('//article[contains(@class, "ReviewCard")]')
+_REVIEW_STARS = etree.XPath('.//span[contains(@class, "RatingStars")]')
+_REVIEW_TEXT = etree.XPath('.//section[contains(@class, "ReviewText")]')
+_REVIEW_LIKES = etree.XPath('.//span[contains(@class, "SocialFooter__count")]')
+
+# Series page selectors
+_SERIES_BOOKS = etree.XPath('//div[@itemtype="http://schema.org/Book"]')
+_SERIES_POSITION = etree.XPath('.//span[contains(@class, "bookMeta")]')
+_SERIES_TITLE = etree.XPath('.//a[contains(@class, "bookTitle")]')
+_SERIES_AUTHOR = etree.XPath('.//a[contains(@class, "authorName")]')
+_SERIES_TABLE_BOOK = etree.XPath('//tr[@itemtype="http://schema.org/Book"]')
+_SERIES_TABLE_TITLE = etree.XPath(
+    './/a[contains(concat(" ", normalize-space(@class), " "), " bookTitle ")]'
+)
+_SERIES_TABLE_AUTHOR = etree.XPath(
+    './/a[contains(concat(" ", normalize-space(@class), " "), " authorName ")]'
+)
+
+
+def _metadata_from_tree(tree: etree._Element) -> dict:
+    """Extract metadata from a parsed Goodreads book page."""
     metadata = {}
 
     # Title
-    title_el = soup.select_one('h1[data-testid="bookTitle"]')
-    if title_el:
-        metadata["title"] = title_el.get_text(strip=True)
+    title_el = first(_TITLE, tree)
+    if title_el is not None:
+        metadata["title"] = get_text(title_el, strip=True)
 
     # Author
-    author_el = soup.select_one('span[data-testid="name"]')
-    if author_el:
-        metadata["author"] = author_el.get_text(strip=True)
+    author_el = first(_AUTHOR, tree)
+    if author_el is not None:
+        metadata["author"] = get_text(author_el, strip=True)
 
     # Genres
     genres = []
-    genre_elements = soup.select('[data-testid="genresList"] a[href*="/genres/"]')
-    for el in genre_elements:
-        genre = el.get_text(strip=True)
+    for el in _GENRE_LINKS(tree):
+        genre = get_text(el, strip=True)
         if genre and genre not in genres:
             genres.append(genre)
     metadata["genres"] = genres
 
     # Average rating
-    rating_el = soup.select_one('div[class*="RatingStatistics__rating"]')
-    if rating_el:
+    rating_el = first(_RATING, tree)
+    if rating_el is not None:
         try:
-            metadata["avg_rating"] = float(rating_el.get_text(strip=True))
+            metadata["avg_rating"] = float(get_text(rating_el, strip=True))
         except ValueError:
             pass
 
     # Number of ratings
-    ratings_count_el = soup.select_one('span[data-testid="ratingsCount"]')
-    if ratings_count_el:
-        text = ratings_count_el.get_text(strip=True)
+    ratings_count_el = first(_RATINGS_COUNT, tree)
+    if ratings_count_el is not None:
+        text = get_text(ratings_count_el, strip=True)
         # Parse "1,234,567 ratings"
         num = re.sub(r"[^\d]", "", text)
         if num:
             metadata["num_ratings"] = int(num)
 
     # Number of pages
-    pages_el = soup.select_one('p[data-testid="pagesFormat"]')
-    if pages_el:
-        text = pages_el.get_text(strip=True)
+    pages_el = first(_PAGES, tree)
+    if pages_el is not None:
+        text = get_text(pages_el, strip=True)
         match = re.search(r"(\d+)\s*pages?", text, re.IGNORECASE)
         if match:
             metadata["num_pages"] = int(match.group(1))
 
     # Publication year
-    pub_el = soup.select_one('p[data-testid="publicationInfo"]')
-    if pub_el:
-        text = pub_el.get_text(strip=True)
+    pub_el = first(_PUBLICATION, tree)
+    if pub_el is not None:
+        text = get_text(pub_el, strip=True)
         match = re.search(r"(\d{4})", text)
         if match:
             metadata["publication_year"] = int(match.group(1))
 
     # Description
-    desc_el = soup.select_one('div[data-testid="description"]')
-    if desc_el:
+    desc_el = first(_DESCRIPTION, tree)
+    if desc_el is not None:
         # Get the truncated or full description
-        spans = desc_el.select("span")
+        spans = _SPANS(desc_el)
         if spans:
-            metadata["description"] = spans[-1].get_text(strip=True)
+            metadata["description"] = get_text(spans[-1], strip=True)
 
     # Series info
-    series_el = soup.select_one('h3[class*="Text__title3"] a[href*="/series/"]')
-    if series_el:
-        series_text = series_el.get_text(strip=True)
+    series_el = first(_SERIES_LINK, tree)
+    if series_el is not None:
+        series_text = get_text(series_el, strip=True)
         series_url = series_el.get("href", "")
 
         # Parse "Series Name #1"
@@ -139,16 +218,20 @@ def parse_reviews(html: str, target_stars: list[int]) -> dict:
     the initially visible reviews. For more comprehensive scraping,
     we'd need to use their API or handle JavaScript.
     """
-    soup = BeautifulSoup(html, "lxml")
+    return _reviews_from_tree(parse_html(html), target_stars)
+
+
+def _reviews_from_tree(tree: etree._Element, target_stars: list[int]) -> dict:
+    """Extract reviews from a parsed Goodreads book page."""
     reviews = {f"{s}_star": [] for s in target_stars}
 
     # Find review containers
-    review_cards = soup.select('article[class*="ReviewCard"]')
+    review_cards = _REVIEW_CARDS(tree)
 
     for card in review_cards:
         # Get star rating
-        stars_el = card.select_one('span[class*="RatingStars"]')
-        if not stars_el:
+        stars_el = first(_REVIEW_STARS, card)
+        if stars_el is None:
             continue
 
         # Count filled stars (aria-label like "Rating 4 out of 5")
@@ -167,23 +250,23 @@ def parse_reviews(html: str, target_stars: list[int]) -> dict:
             continue
 
         # Get review text
-        text_el = card.select_one('section[class*="ReviewText"]')
-        if not text_el:
+        text_el = first(_REVIEW_TEXT, card)
+        if text_el is None:
             continue
 
         # Get the full text from spans
-        spans = text_el.select("span")
-        review_text = spans[-1].get_text(strip=True) if spans else ""
+        spans = _SPANS(text_el)
+        review_text = get_text(spans[-1], strip=True) if spans else ""
 
         if not review_text or len(review_text) < 50:
             continue
 
         # Get likes count
         likes = 0
-        likes_el = card.select_one('span[class*="SocialFooter__count"]')
-        if likes_el:
+        likes_el = first(_REVIEW_LIKES, card)
+        if likes_el is not None:
             try:
-                likes = int(re.sub(r"[^\d]", "", likes_el.get_text()))
+                likes = int(re.sub(r"[^\d]", "", get_text(likes_el)))
             except ValueError:
                 pass
 
@@ -203,45 +286,45 @@ def parse_series_page(html: str) -> Optional[dict]:
 
     Returns dict with goodreads_id, title, author for Book 1, or None if not found.
     """
-    soup = BeautifulSoup(html, "lxml")
+    tree = parse_html(html)
 
     # Find the first book in the series (usually marked as #1)
     # Series pages list books with their position
-    book_items = soup.select('div[itemtype="http://schema.org/Book"]')
+    book_items = _SERIES_BOOKS(tree)
 
     for item in book_items:
         # Check if this is Book 1
-        position_el = item.select_one('span[class*="bookMeta"]')
-        if position_el:
-            text = position_el.get_text()
+        position_el = first(_SERIES_POSITION, item)
+        if position_el is not None:
+            text = get_text(position_el)
             if re.search(r'#1\b|Book 1\b', text):
                 # Found Book 1
-                title_el = item.select_one('a[class*="bookTitle"]')
-                author_el = item.select_one('a[class*="authorName"]')
+                title_el = first(_SERIES_TITLE, item)
+                author_el = first(_SERIES_AUTHOR, item)
 
-                if title_el:
+                if title_el is not None:
                     href = title_el.get("href", "")
                     # Extract ID from URL like /book/show/12345
                     id_match = re.search(r'/book/show/(\d+)', href)
 
                     return {
                         "goodreads_id": id_match.group(1) if id_match else None,
-                        "title": title_el.get_text(strip=True),
-                        "author": author_el.get_text(strip=True) if author_el else None,
+                        "title": get_text(title_el, strip=True),
+                        "author": get_text(author_el, strip=True) if author_el is not None else None,
                     }
 
     # Fallback: try alternate page structure
-    first_book = soup.select_one('tr[itemtype="http://schema.org/Book"]')
-    if first_book:
-        title_el = first_book.select_one('a.bookTitle')
-        author_el = first_book.select_one('a.authorName')
-        if title_el:
+    first_book = first(_SERIES_TABLE_BOOK, tree)
+    if first_book is not None:
+        title_el = first(_SERIES_TABLE_TITLE, first_book)
+        author_el = first(_SERIES_TABLE_AUTHOR, first_book)
+        if title_el is not None:
             href = title_el.get("href", "")
             id_match = re.search(r'/book/show/(\d+)', href)
             return {
                 "goodreads_id": id_match.group(1) if id_match else None,
-                "title": title_el.get_text(strip=True),
-                "author": author_el.get_text(strip=True) if author_el else None,
+                "title": get_text(title_el, strip=True),
+                "author": get_text(author_el, strip=True) if author_el is not None else None,
             }
 
     return None
@@ -250,15 +333,21 @@ def parse_series_page(html: str) -> Optional[dict]:
 async def scrape_series_book_one(
     session: aiohttp.ClientSession,
     series_url: str,
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> Optional[dict]:
     """Fetch series page and return Book 1 info."""
-    html = await fetch_page(session, series_url)
+    html = await fetch_page(session, series_url, cache=cache, limiter=limiter)
     if not html:
         return None
-    return parse_series_page(html)
+    return await run_parser(pool, parse_series_page, html)
 
 
-async def get_book_one_async(goodreads_id: str) -> Optional[dict]:
+async def get_book_one_async(
+    goodreads_id: str,
+    cache: Optional[ResponseCache] = None,
+) -> Optional[dict]:
     """
     Given a book ID, check if it's part of a series and return Book 1 info.
 
@@ -269,10 +358,13 @@ async def get_book_one_async(goodreads_id: str) -> Optional[dict]:
     """
     timeout = aiohttp.ClientTimeout(total=30)
     headers = {"User-Agent": USER_AGENT}
+    limiter = RateLimiter(DEFAULT_RATE, DEFAULT_MIN_RATE, DEFAULT_MAX_RATE)
 
     async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
         # First get the book's metadata to find series info
-        metadata = await scrape_book_metadata(session, goodreads_id)
+        metadata = await scrape_book_metadata(
+            session, goodreads_id, cache=cache, limiter=limiter
+        )
         if not metadata:
             return None
 
@@ -291,69 +383,106 @@ async def get_book_one_async(goodreads_id: str) -> Optional[dict]:
         if not series_url.startswith("http"):
             series_url = f"{GOODREADS_BASE_URL}{series_url}"
 
-        return await scrape_series_book_one(session, series_url)
+        return await scrape_series_book_one(
+            session, series_url, cache=cache, limiter=limiter
+        )
 
 
-def get_book_one(goodreads_id: str) -> Optional[dict]:
+def get_book_one(
+    goodreads_id: str,
+    cache: Optional[ResponseCache] = None,
+) -> Optional[dict]:
     """Synchronous wrapper for get_book_one_async."""
-    return asyncio.run(get_book_one_async(goodreads_id))
+    return asyncio.run(get_book_one_async(goodreads_id, cache))
 
 
 async def scrape_book_metadata(
     session: aiohttp.ClientSession,
     goodreads_id: str,
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> Optional[dict]:
     """Fetch and parse metadata for a single book."""
     url = f"{GOODREADS_BASE_URL}/book/show/{goodreads_id}"
-    html = await fetch_page(session, url)
+    html = await fetch_page(session, url, cache=cache, limiter=limiter)
     if not html:
         return None
-    return parse_book_metadata(html)
+    return await run_parser(pool, parse_book_metadata, html)
 
 
 async def scrape_book_reviews(
     session: aiohttp.ClientSession,
     goodreads_id: str,
     target_stars: list[int] = [5, 3, 1],
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> Optional[dict]:
     """Fetch and parse reviews for a single book."""
     url = f"{GOODREADS_BASE_URL}/book/show/{goodreads_id}"
-    html = await fetch_page(session, url)
+    html = await fetch_page(session, url, cache=cache, limiter=limiter)
     if not html:
         return None
-    return parse_reviews(html, target_stars)
+    return await run_parser(pool, parse_reviews, html, target_stars)
+
+
+async def scrape_book_page(
+    session: aiohttp.ClientSession,
+    goodreads_id: str,
+    target_stars: Optional[list[int]] = [5, 3, 1],
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> tuple[Optional[dict], Optional[dict]]:
+    """
+    Fetch a book page once and parse metadata and reviews from it.
+
+    Pass target_stars=None to skip reviews. Returns (metadata, reviews),
+    both None if the fetch failed. Parsing runs in pool if one is given.
+    """
+    url = f"{GOODREADS_BASE_URL}/book/show/{goodreads_id}"
+    html = await fetch_page(session, url, cache=cache, limiter=limiter)
+    if not html:
+        return None, None
+    return await run_parser(pool, parse_book_page, html, target_stars)
 
 
 async def scrape_candidate(
     session: aiohttp.ClientSession,
-    semaphore: asyncio.Semaphore,
     library: BookLibrary,
     goodreads_id: str,
     pbar: tqdm,
     fetch_reviews: bool = True,
+    pool: Optional[Executor] = None,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> bool:
     """
     Scrape metadata and optionally reviews for a candidate.
 
     Returns True if successful.
     """
-    async with semaphore:
-        # Fetch metadata if needed
-        if not library.has_metadata(goodreads_id):
-            metadata = await scrape_book_metadata(session, goodreads_id)
-            if metadata:
-                library.add_metadata(goodreads_id, metadata)
-            await asyncio.sleep(SCRAPE_DELAY_SECONDS)
-
-        # Fetch reviews if needed and requested
-        if fetch_reviews and not library.has_reviews(goodreads_id):
-            reviews = await scrape_book_reviews(session, goodreads_id)
-            if reviews:
-                library.add_reviews(goodreads_id, reviews)
-            await asyncio.sleep(SCRAPE_DELAY_SECONDS)
+    need_metadata = not library.has_metadata(goodreads_id)
+    need_reviews = fetch_reviews and not library.has_reviews(goodreads_id)
+
+    # Metadata and reviews come from the same page, so fetch it once
+    if need_metadata or need_reviews:
+        metadata, reviews = await scrape_book_page(
+            session,
+            goodreads_id,
+            target_stars=[5, 3, 1] if need_reviews else None,
+            pool=pool,
+            cache=cache,
+            limiter=limiter,
+        )
+        if need_metadata and metadata:
+            library.add_metadata(goodreads_id, metadata)
+        if need_reviews and reviews:
+            library.add_reviews(goodreads_id, reviews)
 
-        pbar.update(1)
-        return True
+    pbar.update(1)
+    return True
 
 
 async def scrape_candidates_async(
@@ -361,39 +490,49 @@ async def scrape_candidates_async(
     goodreads_ids: list[str],
     fetch_reviews: bool = True,
     concurrency: int = MAX_CONCURRENT_REQUESTS,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    cache: Optional[ResponseCache] = None,
 ) -> int:
     """
     Scrape metadata and reviews for multiple candidates.
 
+    A fixed pool of concurrency workers pulls IDs from a bounded queue,
+    so memory stays flat however many IDs are passed. Pages are parsed
+    in a pool of parse_workers processes (0 parses in-process) so
+    parsing doesn't stall the requests in flight. Pages already in the
+    response cache are not downloaded again. Downloads are paced by one
+    adaptive rate limiter shared by all workers.
+
     Returns count of successfully scraped books.
     """
     if not goodreads_ids:
         return 0
 
-    semaphore = asyncio.Semaphore(concurrency)
     timeout = aiohttp.ClientTimeout(total=30)
     headers = {"User-Agent": USER_AGENT}
     connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    limiter = RateLimiter(DEFAULT_RATE, DEFAULT_MIN_RATE, DEFAULT_MAX_RATE)
 
-    success_count = 0
-
-    with tqdm(total=len(goodreads_ids), desc="Scraping books", unit="book") as pbar:
+    with (
+        library.batch(),
+        parse_pool(parse_workers) as pool,
+        tqdm(total=len(goodreads_ids), desc="Scraping books", unit="book") as pbar,
+    ):
         async with aiohttp.ClientSession(
             timeout=timeout,
             headers=headers,
             connector=connector,
         ) as session:
-            tasks = [
-                scrape_candidate(
-                    session, semaphore, library, gid, pbar, fetch_reviews
+
+            async def scrape(gid: str) -> bool:
+                return await scrape_candidate(
+                    session, library, gid, pbar, fetch_reviews, pool, cache, limiter
                 )
-                for gid in goodreads_ids
-            ]
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            success_count = sum(1 for r in results if r is True)
+            stats = await run_worker_pool(goodreads_ids, scrape, concurrency)
+        pbar.write(summarize_workers(stats))
 
-    return success_count
+    return sum(s.completed for s in stats)
 
 
 def scrape_candidates(
@@ -401,6 +540,8 @@ def scrape_candidates(
     goodreads_ids: list[str],
     fetch_reviews: bool = True,
     concurrency: int = MAX_CONCURRENT_REQUESTS,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    cache: Optional[ResponseCache] = None,
 ) -> int:
     """
     Synchronous wrapper for scrape_candidates_async.
@@ -408,5 +549,7 @@ def scrape_candidates(
     Returns count of successfully scraped books.
     """
     return asyncio.run(
-        scrape_candidates_async(library, goodreads_ids, fetch_reviews, concurrency)
+        scrape_candidates_async(
+            library, goodreads_ids, fetch_reviews, concurrency, parse_workers, cache
+        )
     )
@@ -1,14 +1,17 @@
 """Web search utilities using DuckDuckGo."""
 
-import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import Optional
 
 from ddgs import DDGS
 
-from .config import SEARCH_MAX_RESULTS
+from .config import SEARCH_DELAY_SECONDS, SEARCH_MAX_RESULTS, SEARCH_WORKERS
+from .extract import extract, extract_many
 from .library import BookLibrary
+from .storage import search_key
 
 
 @dataclass
@@ -22,42 +25,42 @@ class SearchResult:
     extracted_author: Optional[str] = None
 
 
-def slugify(text: str) -> str:
-    """Convert text to a filename-safe slug."""
-    # Lowercase, replace spaces with underscores, remove non-alphanumeric
-    slug = text.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_-]+", "_", slug)
-    return slug[:100]  # Limit length
-
-
-def execute_search(query: str, max_results: int = SEARCH_MAX_RESULTS) -> list[SearchResult]:
+def execute_search(
+    query: str,
+    max_results: int = SEARCH_MAX_RESULTS,
+    ddgs: Optional[DDGS] = None,
+) -> list[SearchResult]:
     """
     Execute a DuckDuckGo search and return results.
 
     Args:
         query: The search query
         max_results: Maximum number of results to return
+        ddgs: Client to reuse; a new one is opened if not given
 
     Returns:
         List of SearchResult objects
     """
-    results = []
-
-    with DDGS() as ddgs:
-        for r in ddgs.text(query, max_results=max_results):
-            result = SearchResult(
-                title=r.get("title", ""),
-                url=r.get("href", ""),
-                snippet=r.get("body", ""),
-            )
-
-            # Try to extract book/author info from the result
-            book, author = extract_book_author(result.title, result.snippet)
-            result.extracted_book = book
-            result.extracted_author = author
+    if ddgs is None:
+        with DDGS() as ddgs:
+            return execute_search(query, max_results, ddgs)
+
+    results = [
+        SearchResult(
+            title=r.get("title", ""),
+            url=r.get("href", ""),
+            snippet=r.get("body", ""),
+        )
+        for r in ddgs.text(query, max_results=max_results)
+    ]
 
-            results.append(result)
+    # Try to extract book/author info from the results
+    extractions = extract_many(
+        {"title": r.title, "snippet": r.snippet} for r in results
+    )
+    for result, extraction in zip(results, extractions):
+        result.extracted_book = extraction.book
+        result.extracted_author = extraction.author
 
     return results
 
@@ -66,50 +69,156 @@ def extract_book_author(title: str, snippet: str) -> tuple[Optional[str], Option
     """
     Try to extract book title and author from search result.
 
-    Looks for common patterns like:
-    - "Book Title by Author Name"
-    - "Author Name - Book Title"
-    - Goodreads-style "Book Title (Series #1) by Author"
+    See extract.py for the patterns recognized.
 
     Returns:
         Tuple of (book_title, author) or (None, None) if not found
     """
-    text = f"{title} {snippet}"
+    extraction = extract(title, snippet)
+    return extraction.book, extraction.author
+
+
+@dataclass(frozen=True)
+class SearchJob:
+    """One query to run, cached under its search type."""
+
+    search_type: str
+    query: str
+    seed: str = ""  # Title of the seed book, for "similar" searches
+
+
+class _Throttle:
+    """Thread-safe minimum interval between search starts."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+def _result_dicts(results: list[SearchResult]) -> list[dict]:
+    """Convert search results to the dicts stored in the cache."""
+    return [
+        {
+            "title": r.title,
+            "url": r.url,
+            "snippet": r.snippet,
+            "extracted_book": r.extracted_book,
+            "extracted_author": r.extracted_author,
+        }
+        for r in results
+    ]
 
-    # Pattern: "Title by Author"
-    by_pattern = re.search(
-        r'"?([^"]+)"?\s+by\s+([A-Z][a-zA-Z\.\s]+?)(?:\s*[-–—]|\s*\||\s*$)',
-        text,
-        re.IGNORECASE,
-    )
-    if by_pattern:
-        book = by_pattern.group(1).strip().strip('"')
-        author = by_pattern.group(2).strip()
-        # Clean up series notation
-        book = re.sub(r"\s*\([^)]*#\d+[^)]*\)", "", book)
-        return book, author
-
-    # Pattern: "Author - Title" or "Author: Title"
-    author_first = re.search(
-        r"([A-Z][a-zA-Z\.\s]+?)\s*[-–—:]\s*([^,\|]+)",
-        text,
-    )
-    if author_first:
-        author = author_first.group(1).strip()
-        book = author_first.group(2).strip().strip('"')
-        # Only accept if author looks like a name (2-4 words)
-        words = author.split()
-        if 2 <= len(words) <= 4:
-            return book, author
 
-    return None, None
+def run_searches(
+    library: BookLibrary,
+    jobs: list[SearchJob],
+    workers: int = SEARCH_WORKERS,
+    delay: float = SEARCH_DELAY_SECONDS,
+) -> dict[SearchJob, list[dict]]:
+    """
+    Run many searches in parallel, using cached results where available.
+
+    Jobs whose queries normalize to the same cache entry run once.
+    Uncached queries share one DuckDuckGo client and run on a thread
+    pool, with searches started at least delay seconds apart across all
+    threads. Results are cached as they arrive.
+
+    Args:
+        library: BookLibrary instance for caching
+        jobs: Searches to run
+        workers: Searches in flight at once
+        delay: Minimum seconds between search starts
+
+    Returns:
+        Dict mapping each job to its list of result dicts
+    """
+    # One representative job per cache entry
+    unique: dict[tuple[str, str], SearchJob] = {}
+    for job in jobs:
+        unique.setdefault((job.search_type, search_key(job.query)), job)
+
+    found = {}
+    pending = []
+    for entry, job in unique.items():
+        cached = library.get_cached_search(job.search_type, job.query)
+        if cached:
+            found[entry] = cached["results"]
+        else:
+            pending.append((entry, job))
+
+    throttle = _Throttle(delay)
+
+    def search(job: SearchJob) -> list[SearchResult]:
+        throttle.wait()
+        return execute_search(job.query, ddgs=ddgs)
+
+    if pending:
+        with DDGS() as ddgs, ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(search, job): (entry, job) for entry, job in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    entry, job = futures[future]
+                    result_dicts = _result_dicts(future.result())
+                    # Cache from this thread; the library isn't thread-safe
+                    library.cache_search(
+                        job.search_type, job.query, result_dicts, seed=job.seed
+                    )
+                    found[entry] = result_dicts
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    return {job: found[(job.search_type, search_key(job.query))] for job in jobs}
+
+
+def similar_books_jobs(seed_title: str, seed_author: str) -> list[SearchJob]:
+    """Searches for books similar to a seed book."""
+    queries = [
+        f'books similar to "{seed_title}"',
+        f'books like "{seed_title}" by {seed_author}',
+    ]
+    return [SearchJob("similar", query, seed=seed_title) for query in queries]
+
+
+def author_books_jobs(author: str) -> list[SearchJob]:
+    """Searches for books by a specific author."""
+    queries = [
+        f"{author} books list",
+        f"best {author} books",
+    ]
+    return [SearchJob("author", query) for query in queries]
+
+
+def style_jobs(style_query: str) -> list[SearchJob]:
+    """Searches for books matching a style description."""
+    queries = [
+        f"best {style_query} books",
+        f"{style_query} book recommendations",
+    ]
+    return [SearchJob("style", query) for query in queries]
+
+
+def _run_jobs(library: BookLibrary, jobs: list[SearchJob], delay: float) -> list[dict]:
+    """Run jobs and concatenate their results in job order."""
+    results = run_searches(library, jobs, delay=delay)
+    return [r for job in jobs for r in results[job]]
 
 
 def search_similar_books(
     library: BookLibrary,
     seed_title: str,
     seed_author: str,
-    delay: float = 1.0,
+    delay: float = SEARCH_DELAY_SECONDS,
 ) -> list[dict]:
     """
     Search for books similar to a seed book.
@@ -120,54 +229,18 @@ def search_similar_books(
         library: BookLibrary instance for caching
         seed_title: Title of the seed book
         seed_author: Author of the seed book
-        delay: Seconds to wait between searches
+        delay: Minimum seconds between searches
 
     Returns:
         List of search results with extracted book info
     """
-    queries = [
-        f'books similar to "{seed_title}"',
-        f'books like "{seed_title}" by {seed_author}',
-    ]
-
-    all_results = []
-    search_type = "similar"
-
-    for query in queries:
-        slug = slugify(f"{seed_title}_{query[:30]}")
-
-        # Check cache first
-        cached = library.get_cached_search(search_type, slug)
-        if cached:
-            all_results.extend(cached["results"])
-            continue
-
-        # Execute search
-        results = execute_search(query)
-        result_dicts = [
-            {
-                "title": r.title,
-                "url": r.url,
-                "snippet": r.snippet,
-                "extracted_book": r.extracted_book,
-                "extracted_author": r.extracted_author,
-            }
-            for r in results
-        ]
-
-        # Cache results
-        library.cache_search(search_type, slug, query, result_dicts)
-        all_results.extend(result_dicts)
-
-        time.sleep(delay)
-
-    return all_results
+    return _run_jobs(library, similar_books_jobs(seed_title, seed_author), delay)
 
 
 def search_author_books(
     library: BookLibrary,
     author: str,
-    delay: float = 1.0,
+    delay: float = SEARCH_DELAY_SECONDS,
 ) -> list[dict]:
     """
     Search for books by a specific author.
@@ -175,52 +248,18 @@ def search_author_books(
     Args:
         library: BookLibrary instance for caching
         author: Author name to search for
-        delay: Seconds to wait between searches
+        delay: Minimum seconds between searches
 
     Returns:
         List of search results
     """
-    queries = [
-        f"{author} books list",
-        f"best {author} books",
-    ]
-
-    all_results = []
-    search_type = "author"
-
-    for query in queries:
-        slug = slugify(f"{author}_{query[:20]}")
-
-        # Check cache
-        cached = library.get_cached_search(search_type, slug)
-        if cached:
-            all_results.extend(cached["results"])
-            continue
-
-        results = execute_search(query)
-        result_dicts = [
-            {
-                "title": r.title,
-                "url": r.url,
-                "snippet": r.snippet,
-                "extracted_book": r.extracted_book,
-                "extracted_author": r.extracted_author,
-            }
-            for r in results
-        ]
-
-        library.cache_search(search_type, slug, query, result_dicts)
-        all_results.extend(result_dicts)
-
-        time.sleep(delay)
-
-    return all_results
+    return _run_jobs(library, author_books_jobs(author), delay)
 
 
 def search_by_style(
     library: BookLibrary,
     style_query: str,
-    delay: float = 1.0,
+    delay: float = SEARCH_DELAY_SECONDS,
 ) -> list[dict]:
     """
     Search for books matching a style description.
@@ -228,42 +267,9 @@ def search_by_style(
     Args:
         library: BookLibrary instance for caching
         style_query: Style-based search query (e.g., "fantasy immersive worldbuilding")
-        delay: Seconds to wait between searches
+        delay: Minimum seconds between searches
 
     Returns:
         List of search results
     """
-    queries = [
-        f"best {style_query} books",
-        f"{style_query} book recommendations",
-    ]
-
-    all_results = []
-    search_type = "style"
-
-    for query in queries:
-        slug = slugify(query)
-
-        cached = library.get_cached_search(search_type, slug)
-        if cached:
-            all_results.extend(cached["results"])
-            continue
-
-        results = execute_search(query)
-        result_dicts = [
-            {
-                "title": r.title,
-                "url": r.url,
-                "snippet": r.snippet,
-                "extracted_book": r.extracted_book,
-                "extracted_author": r.extracted_author,
-            }
-            for r in results
-        ]
-
-        library.cache_search(search_type, slug, query, result_dicts)
-        all_results.extend(result_dicts)
-
-        time.sleep(delay)
-
-    return all_results
+    return _run_jobs(library, style_jobs(style_query), delay)
@@ -0,0 +1,592 @@
+"""Storage backends for the book library.
+
+JsonStore keeps the original layout (index.json plus one JSON file per
+book). Files are replaced atomically, and index changes are appended to
+index.journal, which is replayed on load and folded back into index.json
+every JOURNAL_CHECKPOINT_EVERY entries. Cached searches of each type
+live in one append-only searches/<type>.jsonl, loaded in a single read.
+SqliteStore keeps the same data in a single library.db, with the index
+flags in indexed columns.
+
+Searches are keyed by search_key(), a hash of the normalized query, so
+distinct queries never share an entry.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import unicodedata
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+SQLITE_DB_NAME = "library.db"
+BACKENDS = ("json", "sqlite")
+
+# Journal entries appended before index.json is rewritten and the journal reset
+JOURNAL_CHECKPOINT_EVERY = 1000
+
+# Index entry fields stored as columns in SQLite
+INDEX_FIELDS = (
+    "title",
+    "author",
+    "has_metadata",
+    "has_reviews",
+    "has_analysis",
+    "has_recommendation",
+    "tier",
+)
+
+# Boolean index flags, stored as 0/1 integers in SQLite
+FLAG_FIELDS = tuple(f for f in INDEX_FIELDS if f.startswith("has_"))
+
+# Max ids per "IN (...)" query, kept under SQLite's variable limit
+_SQLITE_BATCH_SIZE = 500
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so case and spacing variants share an entry."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def search_key(query: str) -> str:
+    """Cache key for a search query: the SHA-256 of its normalized form."""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def _newest_search(a: Optional[dict], b: dict) -> dict:
+    """Pick the more recent of two cached searches for the same key."""
+    if a is None or b.get("searched_at", "") >= a.get("searched_at", ""):
+        return b
+    return a
+
+
+def detect_backend(path: Path) -> str:
+    """Return the backend a library directory uses ("sqlite" if it has a db)."""
+    return "sqlite" if (path / SQLITE_DB_NAME).exists() else "json"
+
+
+def open_store(path: Path, backend: Optional[str] = None):
+    """Open the storage backend for a library directory."""
+    backend = backend or detect_backend(path)
+    if backend == "json":
+        return JsonStore(path)
+    if backend == "sqlite":
+        return SqliteStore(path)
+    raise ValueError(f"Unknown library backend: {backend}")
+
+
+def new_index() -> dict:
+    """Return an empty library index."""
+    return {
+        "version": 1,
+        "books": {},
+        "last_updated": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class JsonStore:
+    """One JSON file per book and per search, plus index.json."""
+
+    backend = "json"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.books_dir = path / "books"
+        self.searches_dir = path / "searches"
+        self.index_path = path / "index.json"
+        self.journal_path = path / "index.journal"
+        self._journal_entries = 0
+        # search_type -> {key: data}, loaded on first use
+        self._searches: dict[str, dict[str, dict]] = {}
+        self._search_lines: dict[str, int] = {}
+
+        # Ensure directories exist
+        self.books_dir.mkdir(parents=True, exist_ok=True)
+        self.searches_dir.mkdir(parents=True, exist_ok=True)
+
+    def transaction(self):
+        """Group writes (a no-op for JSON files)."""
+        return nullcontext()
+
+    def close(self) -> None:
+        """Release resources (nothing to do for JSON files)."""
+
+    # === INDEX ===
+
+    def load_index(self) -> dict:
+        """Load the index from disk and replay the journal, or create a new one."""
+        if self.index_path.exists():
+            index = json.loads(self.index_path.read_text())
+        else:
+            index = new_index()
+
+        self._journal_entries = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "r+b") as f:
+                good_offset = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated journal entry")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted append; drop it
+                        # so later appends start on a clean line
+                        f.truncate(good_offset)
+                        break
+                    index["books"][record["id"]] = record["entry"]
+                    index["last_updated"] = record["at"]
+                    self._journal_entries += 1
+                    good_offset += len(line)
+
+        return index
+
+    def save_index(self, index: dict, changed_ids: Iterable[str]) -> None:
+        """Append the changed entries to the journal, checkpointing when it grows."""
+        lines = [
+            json.dumps(
+                {
+                    "id": gid,
+                    "entry": index["books"][gid],
+                    "at": index.get("last_updated"),
+                }
+            )
+            + "\n"
+            for gid in changed_ids
+        ]
+        if not lines:
+            return
+
+        if self._journal_entries + len(lines) >= JOURNAL_CHECKPOINT_EVERY:
+            self.checkpoint(index)
+            return
+
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += len(lines)
+
+    def checkpoint(self, index: dict) -> None:
+        """Rewrite index.json with the full index and reset the journal."""
+        write_atomic(self.index_path, json.dumps(index, indent=2))
+        # A crash before the reset only means replaying entries already saved
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_entries = 0
+
+    # === BOOKS ===
+
+    def load_book(self, goodreads_id: str) -> Optional[dict]:
+        """Load a book record, or None if it isn't stored."""
+        path = self.books_dir / f"{goodreads_id}.json"
+        if path.exists():
+            return json.loads(path.read_text())
+        return None
+
+    def load_books(self, goodreads_ids: list[str]) -> dict[str, dict]:
+        """Load several book records by id, skipping any that aren't stored."""
+        books = {}
+        for gid in goodreads_ids:
+            book = self.load_book(gid)
+            if book:
+                books[gid] = book
+        return books
+
+    def save_book(self, goodreads_id: str, book: dict) -> None:
+        """Save a book record."""
+        path = self.books_dir / f"{goodreads_id}.json"
+        write_atomic(path, json.dumps(book, indent=2))
+
+    # === SEARCHES ===
+
+    def load_search(self, search_type: str, key: str) -> Optional[dict]:
+        """Load a cached search, or None if it isn't stored."""
+        return self._search_table(search_type).get(key)
+
+    def save_search(self, search_type: str, key: str, data: dict) -> None:
+        """Append a cached search to its type's file."""
+        table = self._search_table(search_type)
+        table[key] = data
+        self._search_lines[search_type] += 1
+
+        # Superseded entries pile up as searches are refreshed; rewrite
+        # the file once they outnumber the live ones
+        if self._search_lines[search_type] > 2 * len(table) + 100:
+            self._rewrite_searches(search_type)
+            return
+
+        with open(self._search_path(search_type), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "data": data}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_searches(self, search_type: str) -> list[dict]:
+        """Load all cached searches of a given type."""
+        return list(self._search_table(search_type).values())
+
+    def iter_searches(self) -> Iterator[tuple[str, str, dict]]:
+        """Yield (search_type, key, data) for every cached search."""
+        search_types = {p.stem for p in self.searches_dir.glob("*.jsonl")}
+        search_types |= {p.name for p in self.searches_dir.iterdir() if p.is_dir()}
+        for search_type in sorted(search_types):
+            table = self._search_table(search_type)
+            for key in sorted(table):
+                yield search_type, key, table[key]
+
+    def iter_searches_since(self, searched_after: str) -> Iterator[tuple[str, str, dict]]:
+        """Yield (search_type, key, data) for searches made after a timestamp."""
+        for search_type, key, data in self.iter_searches():
+            if data.get("searched_at", "") > searched_after:
+                yield search_type, key, data
+
+    def _search_path(self, search_type: str) -> Path:
+        return self.searches_dir / f"{search_type}.jsonl"
+
+    def _search_table(self, search_type: str) -> dict[str, dict]:
+        """Return the in-memory searches of a type, reading its file once."""
+        if search_type in self._searches:
+            return self._searches[search_type]
+
+        table: dict[str, dict] = {}
+        lines = 0
+        path = self._search_path(search_type)
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn line from an interrupted append
+                    table[record["key"]] = record["data"]
+                    lines += 1
+            self._searches[search_type] = table
+            self._search_lines[search_type] = lines
+        else:
+            self._searches[search_type] = table
+            self._search_lines[search_type] = 0
+            self._import_legacy_searches(search_type)
+        return table
+
+    def _import_legacy_searches(self, search_type: str) -> None:
+        """Fold the old one-file-per-slug searches into the type's file."""
+        legacy_dir = self.searches_dir / search_type
+        if not legacy_dir.is_dir():
+            return
+        table = self._searches[search_type]
+        for path in sorted(legacy_dir.glob("*.json")):
+            data = json.loads(path.read_text())
+            key = search_key(data.get("query", ""))
+            table[key] = _newest_search(table.get(key), data)
+        if table:
+            self._rewrite_searches(search_type)
+
+    def _rewrite_searches(self, search_type: str) -> None:
+        """Rewrite a type's file with only its live entries."""
+        table = self._searches[search_type]
+        lines = [json.dumps({"key": k, "data": d}) + "\n" for k, d in table.items()]
+        write_atomic(self._search_path(search_type), "".join(lines))
+        self._search_lines[search_type] = len(lines)
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write a file via a temp file and rename, so readers never see it half-written."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class SqliteStore:
+    """Books, index flags and searches in a single SQLite database."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path, db_name: str = SQLITE_DB_NAME):
+        self.path = path
+        self.db_path = path / db_name
+        path.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._transaction_depth = 0
+        self._create_schema()
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction, committed by the outermost block."""
+        self._transaction_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.conn.rollback()
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0:
+            self.conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    # === INDEX ===
+
+    def load_index(self) -> dict:
+        """Load the index from the book_index table."""
+        index = new_index()
+        for key, value in self.conn.execute("SELECT key, value FROM meta"):
+            index[key] = json.loads(value)
+
+        columns = ", ".join(INDEX_FIELDS)
+        rows = self.conn.execute(
+            f"SELECT goodreads_id, {columns} FROM book_index ORDER BY rowid"
+        )
+        for gid, *values in rows:
+            entry = dict(zip(INDEX_FIELDS, values))
+            for field in FLAG_FIELDS:
+                entry[field] = bool(entry[field])
+            index["books"][gid] = entry
+        return index
+
+    def save_index(self, index: dict, changed_ids: Iterable[str]) -> None:
+        """Upsert the changed index entries and the index metadata."""
+        columns = ", ".join(INDEX_FIELDS)
+        placeholders = ", ".join("?" for _ in INDEX_FIELDS)
+        updates = ", ".join(f"{f} = excluded.{f}" for f in INDEX_FIELDS)
+        rows = [
+            (gid, *_index_row(index["books"][gid]))
+            for gid in changed_ids
+        ]
+        with self.transaction():
+            self.conn.executemany(
+                f"INSERT INTO book_index (goodreads_id, {columns}) "
+                f"VALUES (?, {placeholders}) "
+                f"ON CONFLICT (goodreads_id) DO UPDATE SET {updates}",
+                rows,
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    (key, json.dumps(index.get(key)))
+                    for key in ("version", "last_updated")
+                ],
+            )
+
+    # === BOOKS ===
+
+    def load_book(self, goodreads_id: str) -> Optional[dict]:
+        """Load a book record, or None if it isn't stored."""
+        row = self.conn.execute(
+            "SELECT record FROM books WHERE goodreads_id = ?", (goodreads_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_books(self, goodreads_ids: list[str]) -> dict[str, dict]:
+        """Load several book records by id in a few queries."""
+        records = {}
+        for start in range(0, len(goodreads_ids), _SQLITE_BATCH_SIZE):
+            batch = goodreads_ids[start : start + _SQLITE_BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self.conn.execute(
+                f"SELECT goodreads_id, record FROM books "
+                f"WHERE goodreads_id IN ({placeholders})",
+                batch,
+            )
+            records.update(rows)
+        return {gid: json.loads(record) for gid, record in records.items()}
+
+    def save_book(self, goodreads_id: str, book: dict) -> None:
+        """Save a book record."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO books (goodreads_id, record) VALUES (?, ?)",
+                (goodreads_id, json.dumps(book)),
+            )
+
+    # === SEARCHES ===
+
+    def load_search(self, search_type: str, key: str) -> Optional[dict]:
+        """Load a cached search, or None if it isn't stored."""
+        row = self.conn.execute(
+            "SELECT data FROM search_cache WHERE search_type = ? AND key = ?",
+            (search_type, key),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_search(self, search_type: str, key: str, data: dict) -> None:
+        """Save a cached search."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache (search_type, key, data) "
+                "VALUES (?, ?, ?)",
+                (search_type, key, json.dumps(data)),
+            )
+
+    def load_searches(self, search_type: str) -> list[dict]:
+        """Load all cached searches of a given type."""
+        rows = self.conn.execute(
+            "SELECT data FROM search_cache WHERE search_type = ?", (search_type,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_searches(self) -> Iterator[tuple[str, str, dict]]:
+        """Yield (search_type, key, data) for every cached search."""
+        rows = self.conn.execute(
+            "SELECT search_type, key, data FROM search_cache ORDER BY search_type, key"
+        )
+        for search_type, key, data in rows:
+            yield search_type, key, json.loads(data)
+
+    def iter_searches_since(self, searched_after: str) -> Iterator[tuple[str, str, dict]]:
+        """Yield (search_type, key, data) for searches made after a timestamp."""
+        rows = self.conn.execute(
+            "SELECT search_type, key, data FROM search_cache "
+            "WHERE json_extract(data, '$.searched_at') > ? "
+            "ORDER BY search_type, key",
+            (searched_after,),
+        )
+        for search_type, key, data in rows:
+            yield search_type, key, json.loads(data)
+
+    # === INTERNAL ===
+
+    def _create_schema(self) -> None:
+        """Create tables and indexes if they don't exist yet."""
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS book_index (
+                goodreads_id TEXT PRIMARY KEY,
+                title TEXT,
+                author TEXT,
+                has_metadata INTEGER NOT NULL DEFAULT 0,
+                has_reviews INTEGER NOT NULL DEFAULT 0,
+                has_analysis INTEGER NOT NULL DEFAULT 0,
+                has_recommendation INTEGER NOT NULL DEFAULT 0,
+                tier TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_book_index_has_metadata
+                ON book_index (has_metadata);
+            CREATE INDEX IF NOT EXISTS idx_book_index_has_reviews
+                ON book_index (has_reviews);
+            CREATE INDEX IF NOT EXISTS idx_book_index_has_analysis
+                ON book_index (has_analysis);
+            CREATE INDEX IF NOT EXISTS idx_book_index_tier
+                ON book_index (tier);
+            CREATE TABLE IF NOT EXISTS books (
+                goodreads_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS search_cache (
+                search_type TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (search_type, key)
+            );
+            """
+        )
+        self.conn.commit()
+        self._import_legacy_searches()
+
+    def _import_legacy_searches(self) -> None:
+        """Copy searches from the old slug-keyed table into search_cache."""
+        has_legacy = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'searches'"
+        ).fetchone()
+        if not has_legacy:
+            return
+        if self.conn.execute("SELECT 1 FROM search_cache LIMIT 1").fetchone():
+            return
+
+        newest: dict[tuple[str, str], dict] = {}
+        for search_type, data in self.conn.execute(
+            "SELECT search_type, data FROM searches"
+        ):
+            data = json.loads(data)
+            key = (search_type, search_key(data.get("query", "")))
+            newest[key] = _newest_search(newest.get(key), data)
+
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO search_cache (search_type, key, data) VALUES (?, ?, ?)",
+                [(t, k, json.dumps(d)) for (t, k), d in newest.items()],
+            )
+
+
+def _index_row(entry: dict) -> tuple:
+    """Return an index entry's column values in INDEX_FIELDS order."""
+    return tuple(
+        int(bool(entry.get(f))) if f in FLAG_FIELDS else entry.get(f)
+        for f in INDEX_FIELDS
+    )
+
+
+def migrate_library(path: Path, backend: str = "sqlite") -> dict:
+    """
+    Copy a library into another storage backend.
+
+    The source files are left in place. Since a library.db takes
+    precedence when a library is opened, migrating to SQLite switches
+    the library over. The database is built under a temporary name and
+    only moved into place once everything has been copied, so a failed
+    migration leaves the library as it was.
+
+    Returns counts of migrated books and searches.
+    """
+    source = open_store(path)
+    if source.backend == backend:
+        source.close()
+        raise ValueError(f"Library at {path} already uses the {backend} backend")
+    if backend == "sqlite":
+        tmp_name = f"{SQLITE_DB_NAME}.tmp"
+        _remove_db(path / tmp_name)  # Left over from an interrupted migration
+        target = SqliteStore(path, tmp_name)
+    else:
+        target = open_store(path, backend)
+
+    completed = False
+    try:
+        index = source.load_index()
+        book_ids = list(index["books"])
+        searches = 0
+
+        with target.transaction():
+            target.save_index(index, book_ids)
+            for gid in book_ids:
+                book = source.load_book(gid)
+                if book:
+                    target.save_book(gid, book)
+            for search_type, key, data in source.iter_searches():
+                target.save_search(search_type, key, data)
+                searches += 1
+        completed = True
+    finally:
+        source.close()
+        target.close()
+        if backend == "sqlite":
+            if completed:
+                os.replace(target.db_path, path / SQLITE_DB_NAME)
+            else:
+                _remove_db(target.db_path)
+
+    return {"books": len(book_ids), "searches": searches}
+
+
+def _remove_db(db_path: Path) -> None:
+    """Delete a SQLite database file and its WAL side files, if present."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
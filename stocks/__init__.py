@@ -1,7 +1,18 @@
 """Inflation-adjusted stock analysis framework."""
 
-from .data import fetch_stock, fetch_cpi, fetch_stock_and_cpi
-from .adjust import adjust_for_inflation, calculate_real_returns, combine_weighted
+from .data import (
+    fetch_stock,
+    fetch_stocks,
+    fetch_close_matrix,
+    fetch_cpi,
+    fetch_stock_and_cpi,
+)
+from .adjust import (
+    CPIDeflator,
+    adjust_for_inflation,
+    calculate_real_returns,
+    combine_weighted,
+)
 from .plot import (
     plot_nominal_vs_real,
     plot_nominal_vs_real_interactive,
@@ -11,8 +22,11 @@ from .plot import (
 
 __all__ = [
     "fetch_stock",
+    "fetch_stocks",
+    "fetch_close_matrix",
     "fetch_cpi",
     "fetch_stock_and_cpi",
+    "CPIDeflator",
     "adjust_for_inflation",
     "calculate_real_returns",
     "combine_weighted",
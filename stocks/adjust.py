@@ -6,6 +6,88 @@ import numpy as np
 from .config import DEFAULT_BASE_DATE
 
 
+class CPIDeflator:
+    """
+    Monthly CPI interpolated once onto a daily grid, for deflating prices.
+
+    The daily values are a NumPy array indexed by days since the first CPI
+    month, so looking up any date is arithmetic rather than a search, and
+    deflating a price series (or a whole date × ticker matrix) is one
+    vectorized gather. Build one per CPI series and reuse it for every
+    ticker.
+
+    Dates before the first CPI month have no CPI (NaN); dates after the
+    last one use the latest value.
+    """
+
+    def __init__(self, cpi: pd.Series):
+        cpi = cpi.dropna().sort_index()
+        months = pd.to_datetime(cpi.index).values.astype("datetime64[D]")
+        if len(months) == 0:
+            raise ValueError("CPI series is empty")
+
+        self.start = months[0]
+        days = (months - self.start).astype(np.int64)
+        # Linear in days between monthly observations
+        self.daily = np.interp(np.arange(days[-1] + 1), days, cpi.to_numpy(dtype=float))
+
+    def index_of(self, dates) -> np.ndarray:
+        """Positions of dates in the daily grid (may fall outside it)."""
+        dates = pd.DatetimeIndex(dates)
+        if dates.tz:
+            dates = dates.tz_localize(None)
+        return (dates.values.astype("datetime64[D]") - self.start).astype(np.int64)
+
+    def cpi_at(self, dates) -> np.ndarray:
+        """Daily CPI for each date."""
+        index = self.index_of(dates)
+        values = self.daily[np.clip(index, 0, len(self.daily) - 1)]
+        values[index < 0] = np.nan
+        return values
+
+    def _base_cpi(self, dates: pd.DatetimeIndex, base_date: str | None) -> float:
+        """CPI on the date in dates nearest to the base date."""
+        base = pd.Timestamp(base_date or DEFAULT_BASE_DATE)
+        if dates.tz:
+            dates = dates.tz_localize(None)
+        nearest = dates.get_indexer([base], method="nearest")[0]
+        return self.cpi_at(dates[nearest : nearest + 1])[0]
+
+    def deflate(self, prices: pd.Series | pd.DataFrame, base_date: str | None = None):
+        """
+        Convert nominal prices to real prices, in terms of the CPI on the
+        trading date nearest the base date.
+
+        prices can be a Series or a DataFrame with one column per ticker
+        (e.g. from fetch_close_matrix); every column shares one gather.
+        """
+        factors = self._base_cpi(prices.index, base_date) / self.cpi_at(prices.index)
+        if isinstance(prices, pd.DataFrame):
+            return prices.mul(factors, axis=0)
+        return prices * factors
+
+    def adjust(
+        self,
+        stock_df: pd.DataFrame,
+        base_date: str | None = None,
+        price_column: str = "Close",
+    ) -> pd.DataFrame:
+        """Adjust one stock's prices for inflation (see adjust_for_inflation)."""
+        result = stock_df.copy()
+
+        # Normalize index to timezone-naive
+        if result.index.tz:
+            result.index = result.index.tz_localize(None)
+
+        # Real Price = Nominal Price × (CPI_base / CPI_current)
+        result["cpi"] = self.cpi_at(result.index)
+        base_cpi = self._base_cpi(result.index, base_date)
+        result["nominal_price"] = result[price_column]
+        result["real_price"] = result[price_column] * (base_cpi / result["cpi"])
+
+        return result
+
+
 def interpolate_cpi_to_daily(cpi: pd.Series, target_index: pd.DatetimeIndex) -> pd.Series:
     """
     Interpolate monthly CPI values to daily values.
@@ -17,25 +99,9 @@ def interpolate_cpi_to_daily(cpi: pd.Series, target_index: pd.DatetimeIndex) ->
     Returns:
         Daily CPI series aligned with target_index
     """
-    # Convert CPI index to datetime if needed
-    cpi = cpi.copy()
-    cpi.index = pd.to_datetime(cpi.index)
-
     # Normalize target index to timezone-naive
     target_naive = target_index.tz_localize(None) if target_index.tz else target_index
-
-    # Create a daily date range covering the full period
-    daily_range = pd.date_range(
-        start=min(cpi.index.min(), target_naive.min()),
-        end=max(cpi.index.max(), target_naive.max()),
-        freq="D",
-    )
-
-    # Reindex CPI to daily and interpolate
-    daily_cpi = cpi.reindex(daily_range).interpolate(method="linear")
-
-    # Align with target index
-    return daily_cpi.reindex(target_naive)
+    return pd.Series(CPIDeflator(cpi).cpi_at(target_naive), index=target_naive)
 
 
 def adjust_for_inflation(
@@ -47,6 +113,9 @@ def adjust_for_inflation(
     """
     Adjust stock prices for inflation.
 
+    When adjusting several stocks with the same CPI, build one CPIDeflator
+    and call its adjust() instead, so the CPI is interpolated only once.
+
     Args:
         stock_df: DataFrame with stock prices (from fetch_stock)
         cpi: CPI series (from fetch_cpi)
@@ -59,35 +128,7 @@ def adjust_for_inflation(
         - 'real_price': inflation-adjusted price
         - 'nominal_price': copy of original price for comparison
     """
-    base_date = base_date or DEFAULT_BASE_DATE
-    result = stock_df.copy()
-
-    # Normalize index to timezone-naive
-    if result.index.tz:
-        result.index = result.index.tz_localize(None)
-
-    # Get the stock's date index
-    stock_index = result.index
-
-    # Interpolate CPI to daily values
-    daily_cpi = interpolate_cpi_to_daily(cpi, stock_index)
-    result["cpi"] = daily_cpi.values
-
-    # Get base CPI value
-    base_dt = pd.Timestamp(base_date)
-    if base_dt in daily_cpi.index:
-        base_cpi = daily_cpi.loc[base_dt]
-    else:
-        # Find nearest date
-        nearest_idx = daily_cpi.index.get_indexer([base_dt], method="nearest")[0]
-        base_cpi = daily_cpi.iloc[nearest_idx]
-
-    # Calculate real (inflation-adjusted) price
-    # Real Price = Nominal Price × (CPI_base / CPI_current)
-    result["nominal_price"] = result[price_column]
-    result["real_price"] = result[price_column] * (base_cpi / result["cpi"])
-
-    return result
+    return CPIDeflator(cpi).adjust(stock_df, base_date, price_column)
 
 
 def combine_weighted(
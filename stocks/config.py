@@ -11,4 +11,8 @@ DEFAULT_BASE_DATE = "2020-01-01"
 
 # Cache settings
 CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
-CACHE_EXPIRY_DAYS = 1
+CACHE_EXPIRY_DAYS = 1  # Minimum days between checks for a new CPI release
+COMPACT_PARTS = 30  # Price parquet parts per ticker before compacting into one
+
+# Fetch settings
+FETCH_WORKERS = 8  # Concurrent Yahoo Finance downloads
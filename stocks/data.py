@@ -1,38 +1,23 @@
 """Data fetching for stocks and CPI."""
 
-import os
-import hashlib
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
 import pandas as pd
 import requests
 import yfinance as yf
 
 from .config import (
-    CACHE_DIR,
-    CACHE_EXPIRY_DAYS,
     DEFAULT_START_DATE,
     DEFAULT_END_DATE,
+    FETCH_WORKERS,
 )
+from .store import CPIStore, PriceStore, Range, resolve_range
 
 # BLS series ID for CPI-U (All Urban Consumers, All Items)
 BLS_CPI_SERIES = "CUSR0000SA0"
 BLS_API_URL = "https://api.bls.gov/publicAPI/v1/timeseries/data/"
-
-
-def _get_cache_path(key: str) -> str:
-    """Get cache file path for a given key."""
-    os.makedirs(CACHE_DIR, exist_ok=True)
-    hashed = hashlib.md5(key.encode()).hexdigest()
-    return os.path.join(CACHE_DIR, f"{hashed}.parquet")
-
-
-def _is_cache_valid(path: str) -> bool:
-    """Check if cache file exists and is not expired."""
-    if not os.path.exists(path):
-        return False
-    mtime = datetime.fromtimestamp(os.path.getmtime(path))
-    return datetime.now() - mtime < timedelta(days=CACHE_EXPIRY_DAYS)
+BLS_MAX_YEARS = 10  # BLS API v1 (no key) allows max 10 years per request
 
 
 def fetch_stock(
@@ -54,25 +39,200 @@ def fetch_stock(
         DataFrame with columns: Open, High, Low, Close, Volume, Dividends, Stock Splits
         Index is DatetimeIndex
     """
-    start = start or DEFAULT_START_DATE
-    end = end or DEFAULT_END_DATE
+    return fetch_stocks([ticker], start, end, use_cache)[ticker]
+
 
-    cache_key = f"stock_{ticker}_{start}_{end}"
-    cache_path = _get_cache_path(cache_key)
+def fetch_stocks(
+    tickers: list[str],
+    start: str | None = None,
+    end: str | None = None,
+    use_cache: bool = True,
+    max_workers: int = FETCH_WORKERS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch stock price data for several tickers from Yahoo Finance.
 
-    if use_cache and _is_cache_valid(cache_path):
-        return pd.read_parquet(cache_path)
+    Prices are served from the range-aware PriceStore, read in one scan
+    for all tickers. Only the parts of the window it doesn't cover yet
+    (usually the last few days) are downloaded, concurrently on a pool
+    of max_workers threads.
 
-    stock = yf.Ticker(ticker)
-    df = stock.history(start=start, end=end)
+    Args:
+        tickers: Stock symbols (e.g., ["AAPL", "MSFT"])
+        start: Start date as string "YYYY-MM-DD"
+        end: End date as string "YYYY-MM-DD" (default: today)
+        use_cache: Whether to use cached data
+        max_workers: Maximum concurrent downloads
 
-    if df.empty:
-        raise ValueError(f"No data found for ticker: {ticker}")
+    Returns:
+        Dict mapping each ticker to its DataFrame (as from fetch_stock),
+        in the order given
+    """
+    wanted = resolve_range(start or DEFAULT_START_DATE, end or DEFAULT_END_DATE)
+    tickers = list(dict.fromkeys(tickers))
+    store = PriceStore()
 
     if use_cache:
-        df.to_parquet(cache_path)
+        _update_store(store, tickers, wanted, max_workers)
+        stocks = store.load_many(tickers, wanted)
+    else:
+        gaps = {t: [wanted] for t in tickers}
+        downloaded = _download_all(store, tickers, gaps, wanted, max_workers, use_cache=False)
+        stocks = {t: df for t, (df, _, _) in downloaded.items()}
+
+    missing = [t for t in tickers if stocks.get(t, pd.DataFrame()).empty]
+    if missing:
+        raise ValueError(f"No data found for ticker: {', '.join(missing)}")
+
+    return {ticker: stocks[ticker] for ticker in tickers}
+
+
+def fetch_close_matrix(
+    tickers: list[str],
+    start: str | None = None,
+    end: str | None = None,
+    column: str = "Close",
+    max_workers: int = FETCH_WORKERS,
+) -> pd.DataFrame:
+    """
+    Fetch one price column for many tickers as a wide matrix.
+
+    Uncovered ranges are downloaded into the PriceStore first; the matrix
+    is then read from it in one scan that only touches the requested
+    tickers, years and columns.
+
+    Args:
+        tickers: Stock symbols (e.g., ["AAPL", "MSFT"])
+        start: Start date as string "YYYY-MM-DD"
+        end: End date as string "YYYY-MM-DD" (default: today)
+        column: Which price column to read
+        max_workers: Maximum concurrent downloads
+
+    Returns:
+        DataFrame indexed by timezone-naive trading date with one column
+        per ticker; NaN where a ticker has no price for a date
+    """
+    wanted = resolve_range(start or DEFAULT_START_DATE, end or DEFAULT_END_DATE)
+    tickers = list(dict.fromkeys(tickers))
+    store = PriceStore()
+    _update_store(store, tickers, wanted, max_workers)
+
+    matrix = store.close_matrix(tickers, wanted, column)
+    missing = [t for t in tickers if t not in matrix.columns]
+    if missing:
+        raise ValueError(f"No data found for ticker: {', '.join(missing)}")
+    return matrix
+
+
+def _update_store(
+    store: PriceStore,
+    tickers: list[str],
+    wanted: Range,
+    max_workers: int,
+) -> None:
+    """Download whatever the store doesn't cover yet and add it."""
+    gaps = {t: store.missing(t, wanted) for t in tickers}
+    downloaded = _download_all(store, tickers, gaps, wanted, max_workers, use_cache=True)
+    for ticker, (df, covered, rebuilt) in downloaded.items():
+        if rebuilt:
+            store.replace(ticker, df, covered)
+        elif covered or not df.empty:
+            store.append(ticker, df, covered)
+
+
+def _download_all(
+    store: PriceStore,
+    tickers: list[str],
+    gaps: dict[str, list[Range]],
+    wanted: Range,
+    max_workers: int,
+    use_cache: bool,
+) -> dict[str, tuple[pd.DataFrame, list[Range], bool]]:
+    """Download each ticker's gaps concurrently (see _download_missing)."""
+    misses = [t for t in tickers if gaps[t]]
+    if not misses:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as pool:
+        results = pool.map(
+            lambda t: _download_missing(store, t, gaps[t], wanted, use_cache), misses
+        )
+        return dict(zip(misses, results))
+
 
-    return df
+def _download_missing(
+    store: PriceStore,
+    ticker: str,
+    gaps: list[Range],
+    wanted: Range,
+    use_cache: bool,
+) -> tuple[pd.DataFrame, list[Range], bool]:
+    """
+    Download the uncovered ranges for one ticker.
+
+    Yahoo's prices are dividend- and split-adjusted as of the download,
+    so a new dividend or split in the tail makes the stored history
+    stale. New rows are also adjusted as of today, so when a request only
+    fills an earlier gap and the stored history ends before today, the
+    tail since then is fetched too and checked the same way.
+
+    On a new dividend or split the ticker's whole span is downloaded
+    again. If that download fails the rows are appended as usual instead,
+    but the tail is left uncovered so the rebuild is retried next time.
+
+    Returns (rows, ranges the rows cover, whether they replace the stored
+    history rather than being appended).
+    """
+    covered = store.coverage(ticker) if use_cache else []
+    settled = covered[-1][1] if covered else None
+    today = date.today()
+    if settled and settled < today and all(end <= settled for _, end in gaps):
+        gaps = [*gaps, (settled, today + timedelta(days=1))]
+
+    first_stored = store.first_date(ticker) if covered else None
+    df, fetched = _download_ranges(ticker, gaps, first_stored)
+    if not covered or df.empty:
+        return df, fetched, False
+
+    tail = df[df.index >= pd.Timestamp(settled).tz_localize(df.index.tz)]
+    if not tail.filter(["Dividends", "Stock Splits"]).any().any():
+        return df, fetched, False
+
+    span = (min(covered[0][0], wanted[0]), max(settled, *(end for _, end in gaps)))
+    rebuilt, rebuilt_fetched = _download_ranges(ticker, [span])
+    if rebuilt.empty:
+        return df, [(start, end) for start, end in fetched if end <= settled], False
+    return rebuilt, rebuilt_fetched, True
+
+
+def _download_ranges(
+    ticker: str,
+    ranges: list[Range],
+    first_stored: date | None = None,
+) -> tuple[pd.DataFrame, list[Range]]:
+    """
+    Download one ticker's price history for each [start, end) range.
+
+    Returns the rows and the ranges to mark as fetched. A range with no
+    rows may just have no trading days (before the listing, or only a
+    weekend or holiday), but yfinance also returns an empty frame on
+    errors. So an empty range counts as fetched when another range
+    returned rows in the same call, or when it ends by the ticker's first
+    stored date; if every range came back empty, none are, and they are
+    retried on the next call.
+    """
+    stock = yf.Ticker(ticker)
+    frames = []
+    empty = []
+    for start, end in ranges:
+        frame = stock.history(start=start.isoformat(), end=end.isoformat())
+        if frame.empty:
+            empty.append((start, end))
+        else:
+            frames.append(frame)
+    if not frames:
+        fetched = [r for r in empty if first_stored and r[1] <= first_stored]
+        return pd.DataFrame(), fetched
+    return pd.concat(frames).sort_index(), list(ranges)
 
 
 def fetch_cpi(
@@ -83,7 +243,10 @@ def fetch_cpi(
     """
     Fetch CPI data from BLS (Bureau of Labor Statistics).
 
-    No API key required - uses the public API.
+    No API key required - uses the public API. The monthly series is kept
+    in a CPIStore and any date range is sliced from it; BLS is only asked
+    for years the store doesn't have yet, or for the current year once a
+    new monthly release is due.
 
     Args:
         start: Start date as string "YYYY-MM-DD"
@@ -96,40 +259,54 @@ def fetch_cpi(
     start = start or DEFAULT_START_DATE
     end = end or DEFAULT_END_DATE
 
-    cache_key = f"cpi_bls_{start}_{end}"
-    cache_path = _get_cache_path(cache_key)
+    start_year = int(start[:4])
+    end_year = min(int(end[:4]), datetime.now().year) if end else datetime.now().year
 
-    if use_cache and _is_cache_valid(cache_path):
-        df = pd.read_parquet(cache_path)
-        return df["cpi"]
+    if use_cache:
+        store = CPIStore()
+        years = store.years_to_fetch(start_year, end_year)
+        cpi = store.update(_fetch_bls_years(years), years) if years else store.load()
+    else:
+        cpi = _fetch_bls_years(list(range(start_year, end_year + 1)))
 
-    start_year = int(start[:4])
-    end_year = int(end[:4]) if end else datetime.now().year
-
-    # BLS API v1 (no key) allows max 10 years per request
-    all_data = []
-    for chunk_start in range(start_year, end_year + 1, 10):
-        chunk_end = min(chunk_start + 9, end_year)
-
-        response = requests.post(
-            BLS_API_URL,
-            json={
-                "seriesid": [BLS_CPI_SERIES],
-                "startyear": str(chunk_start),
-                "endyear": str(chunk_end),
-            },
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
+    # Filter to requested date range
+    cpi = cpi[cpi.index >= start]
+    if end:
+        cpi = cpi[cpi.index <= end]
 
-        result = response.json()
-        if result["status"] != "REQUEST_SUCCEEDED":
-            raise ValueError(f"BLS API error: {result.get('message', 'Unknown error')}")
+    if cpi.empty:
+        raise ValueError("No CPI data found for the given date range")
 
-        series_data = result["Results"]["series"][0]["data"]
-        all_data.extend(series_data)
+    return cpi
 
-    # Parse into DataFrame
+
+def _fetch_bls_years(years: list[int]) -> pd.Series:
+    """
+    Download the monthly CPI for some years from BLS.
+
+    Consecutive years are grouped into as few requests as the API allows,
+    and the requests run concurrently over one pooled session.
+    """
+    if not years:
+        return pd.Series(dtype=float, name="cpi", index=pd.DatetimeIndex([], name="date"))
+
+    chunks = []
+    for year in sorted(years):
+        if chunks and year == chunks[-1][-1] + 1 and len(chunks[-1]) < BLS_MAX_YEARS:
+            chunks[-1].append(year)
+        else:
+            chunks.append([year])
+
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=FETCH_WORKERS)
+        session.mount("https://", adapter)
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(chunks))) as pool:
+            results = pool.map(
+                lambda chunk: _fetch_bls_chunk(session, chunk[0], chunk[-1]), chunks
+            )
+            all_data = [item for data in results for item in data]
+
+    # Parse into a series
     records = []
     for item in all_data:
         # BLS uses M01-M12 for months, M13 for annual average
@@ -146,26 +323,32 @@ def fetch_cpi(
         date = datetime(year, month, 1)
         records.append({"date": date, "cpi": value})
 
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records, columns=["date", "cpi"])
     df = df.drop_duplicates(subset=["date"])
-    df = df.set_index("date").sort_index()
-
-    # Filter to requested date range
-    if start:
-        df = df[df.index >= start]
-    if end:
-        df = df[df.index <= end]
-
-    if df.empty:
-        raise ValueError("No CPI data found for the given date range")
-
-    cpi = df["cpi"]
+    df["date"] = pd.to_datetime(df["date"])
+    cpi = df.set_index("date").sort_index()["cpi"]
     cpi.name = "cpi"
+    return cpi
 
-    if use_cache:
-        df.to_parquet(cache_path)
 
-    return cpi
+def _fetch_bls_chunk(session: requests.Session, start_year: int, end_year: int) -> list[dict]:
+    """Make one BLS API request for a span of at most BLS_MAX_YEARS years."""
+    response = session.post(
+        BLS_API_URL,
+        json={
+            "seriesid": [BLS_CPI_SERIES],
+            "startyear": str(start_year),
+            "endyear": str(end_year),
+        },
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+
+    result = response.json()
+    if result["status"] != "REQUEST_SUCCEEDED":
+        raise ValueError(f"BLS API error: {result.get('message', 'Unknown error')}")
+
+    return result["Results"]["series"][0]["data"]
 
 
 def fetch_stock_and_cpi(
@@ -4,8 +4,8 @@ import argparse
 import sys
 
 from .config import DEFAULT_START_DATE, DEFAULT_BASE_DATE
-from .data import fetch_stock, fetch_cpi
-from .adjust import adjust_for_inflation, calculate_real_returns, combine_weighted
+from .data import fetch_stocks, fetch_cpi
+from .adjust import CPIDeflator, calculate_real_returns, combine_weighted
 from .plot import (
     plot_nominal_vs_real,
     plot_nominal_vs_real_interactive,
@@ -100,14 +100,14 @@ Examples:
         print(f"Fetching CPI data...")
         cpi = fetch_cpi(args.start, args.end, use_cache=not args.no_cache)
         print(f"  Got {len(cpi)} monthly CPI values")
+        # Interpolated once and shared by every ticker
+        deflator = CPIDeflator(cpi)
 
-        # Fetch all stocks
-        stocks = {}
-        for ticker in args.tickers:
-            print(f"Fetching {ticker}...")
-            stock = fetch_stock(ticker, args.start, args.end, use_cache=not args.no_cache)
-            print(f"  Got {len(stock)} trading days")
-            stocks[ticker] = stock
+        # Fetch all stocks (cache misses download concurrently)
+        print(f"Fetching {', '.join(args.tickers)}...")
+        stocks = fetch_stocks(args.tickers, args.start, args.end, use_cache=not args.no_cache)
+        for ticker, stock in stocks.items():
+            print(f"  {ticker}: got {len(stock)} trading days")
 
         # Handle weighted portfolio
         if args.weights:
@@ -117,7 +117,7 @@ Examples:
                 print(f"  {ticker}: {weight*100:.0f}%")
 
             combined = combine_weighted(stocks, weights)
-            adjusted = adjust_for_inflation(combined, cpi, args.base_date)
+            adjusted = deflator.adjust(combined, args.base_date)
 
             if args.stats:
                 returns = calculate_real_returns(adjusted)
@@ -143,7 +143,7 @@ Examples:
             # Process each ticker individually
             adjusted_data = {}
             for ticker, stock in stocks.items():
-                adjusted = adjust_for_inflation(stock, cpi, args.base_date)
+                adjusted = deflator.adjust(stock, args.base_date)
                 adjusted_data[ticker] = adjusted
 
                 if args.stats:
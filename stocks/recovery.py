@@ -3,7 +3,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from .data import fetch_stock, fetch_cpi
+from .data import fetch_stocks, fetch_cpi
 from .adjust import combine_weighted, adjust_for_inflation
 
 
@@ -90,15 +90,11 @@ def plot_recovery(
 if __name__ == "__main__":
     # Fetch data (uses cache)
     print("Loading data from cache...")
-    spy = fetch_stock("SPY", "2005-01-01", "2025-01-01")
-    efa = fetch_stock("EFA", "2005-01-01", "2025-01-01")
+    stocks = fetch_stocks(["SPY", "EFA"], "2005-01-01", "2025-01-01")
     cpi = fetch_cpi("2005-01-01", "2025-01-01")
 
     # Combine into portfolio
-    portfolio = combine_weighted(
-        {"SPY": spy, "EFA": efa},
-        {"SPY": 0.6, "EFA": 0.4}
-    )
+    portfolio = combine_weighted(stocks, {"SPY": 0.6, "EFA": 0.4})
 
     # Find pre-2009 peak
     peak_date, peak_nominal = find_peak_before(portfolio, "2009-01-01")
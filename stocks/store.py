@@ -0,0 +1,377 @@
+"""On-disk caches for daily stock prices and monthly CPI.
+
+All tickers live in one parquet dataset, hive-partitioned by ticker
+(price_dataset/ticker=SPY/part-000000.parquet) with one row group per
+year, so a query for a few tickers over a few years only opens those
+tickers' files, skips the other years' row groups by their statistics,
+and only reads the columns it asks for. Each ticker directory also
+holds a _meta.json with the date ranges already downloaded and the
+ticker's timezone. A request is served by slicing the stored rows, and
+only the parts of the window that aren't covered yet (usually just the
+last few days) are fetched from Yahoo.
+
+Parts are append-only: new downloads are written as new files and rows
+for the same date are resolved in favor of the newest part. Once a
+ticker has too many parts they are compacted into one.
+
+CPI is one monthly series. The store remembers which years are final
+(fetched after their December release) so only the open year is ever
+checked again, and only once its next monthly release is due.
+"""
+
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .config import CACHE_DIR, CACHE_EXPIRY_DAYS, COMPACT_PARTS
+
+PRICES_DIR = os.path.join(CACHE_DIR, "price_dataset")
+CPI_DIR = os.path.join(CACHE_DIR, "cpi")
+DATE_COLUMN = "Date"
+_META_FILE = "_meta.json"  # Leading underscore keeps it out of the dataset
+
+_PARTITIONING = ds.partitioning(pa.schema([("ticker", pa.string())]), flavor="hive")
+
+Range = tuple[date, date]  # [start, end), end exclusive like Yahoo's
+
+
+def resolve_range(start: str, end: str | None) -> Range:
+    """Turn "YYYY-MM-DD" start/end (end None = today) into a date range."""
+    tomorrow = date.today() + timedelta(days=1)
+    end_date = date.fromisoformat(end) if end else tomorrow
+    return date.fromisoformat(start), end_date
+
+
+def subtract_ranges(wanted: Range, covered: list[Range]) -> list[Range]:
+    """Return the parts of wanted not inside any covered range."""
+    gaps = []
+    cursor, end = wanted
+    for covered_start, covered_end in sorted(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_ranges(ranges: list[Range]) -> list[Range]:
+    """Merge overlapping or touching ranges."""
+    merged: list[Range] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def slice_range(df: pd.DataFrame, wanted: Range) -> pd.DataFrame:
+    """Select the rows of a price DataFrame that fall in [start, end)."""
+    dates = df.index.tz_localize(None) if df.index.tz else df.index
+    start, end = (pd.Timestamp(d) for d in wanted)
+    return df[(dates >= start) & (dates < end)]
+
+
+class PriceStore:
+    """Price cache for many tickers, as one partitioned parquet dataset."""
+
+    def __init__(self, directory: str = PRICES_DIR):
+        self.directory = directory
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"ticker={ticker}")
+
+    def _meta(self, ticker: str) -> dict:
+        path = os.path.join(self._ticker_dir(ticker), _META_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def coverage(self, ticker: str) -> list[Range]:
+        """Date ranges already downloaded for a ticker."""
+        ranges = self._meta(ticker).get("ranges", [])
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in ranges]
+
+    def missing(self, ticker: str, wanted: Range) -> list[Range]:
+        """Date ranges in wanted that still need to be downloaded."""
+        return subtract_ranges(wanted, self.coverage(ticker))
+
+    def first_date(self, ticker: str) -> date | None:
+        """Date of a ticker's earliest stored row, or None if it has none."""
+        dates = self._read([ticker], columns=[DATE_COLUMN])[DATE_COLUMN]
+        return dates.min().date() if len(dates) else None
+
+    def load(self, ticker: str, wanted: Range | None = None) -> pd.DataFrame:
+        """Read a ticker's stored rows, optionally sliced to a date range."""
+        return self.load_many([ticker], wanted).get(ticker, pd.DataFrame())
+
+    def load_many(
+        self,
+        tickers: list[str],
+        wanted: Range | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Read several tickers' rows in one dataset scan.
+
+        Returns DataFrames shaped like yfinance's history(), with each
+        ticker's timezone restored. Tickers with no stored rows are left
+        out.
+        """
+        long = self._read(tickers, wanted)
+        stocks = {}
+        for ticker, rows in long.groupby("ticker", sort=False):
+            df = rows.drop(columns="ticker").set_index(DATE_COLUMN)
+            # Drop columns that only other tickers have (e.g. Capital Gains)
+            df = df.dropna(axis="columns", how="all")
+            tz = self._meta(ticker).get("timezone")
+            if tz:
+                df.index = df.index.tz_localize(tz)
+            stocks[ticker] = df
+        return {t: stocks[t] for t in tickers if t in stocks}
+
+    def close_matrix(
+        self,
+        tickers: list[str],
+        wanted: Range | None = None,
+        column: str = "Close",
+    ) -> pd.DataFrame:
+        """
+        Read one price column for several tickers as a wide matrix.
+
+        Only the date and price columns of the requested tickers' row
+        groups for the window are read. The index is timezone-naive trading dates
+        and there is one column per ticker, in the order given; a ticker
+        that didn't trade on a date has NaN there.
+        """
+        long = self._read(tickers, wanted, columns=[DATE_COLUMN, column])
+        matrix = long.pivot(index=DATE_COLUMN, columns="ticker", values=column)
+        matrix.columns.name = None
+        return matrix.reindex(columns=[t for t in tickers if t in matrix.columns])
+
+    def _read(
+        self,
+        tickers: list[str],
+        wanted: Range | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Read matching rows as one long DataFrame with a ticker column."""
+        paths = self._parts(tickers)
+        if not paths:
+            return pd.DataFrame(columns=[DATE_COLUMN, *(columns or [])[1:], "ticker"])
+
+        # Tickers can have different columns (funds add Capital Gains)
+        schema = pa.unify_schemas(
+            [pq.read_schema(p) for p in paths] + [_PARTITIONING.schema],
+            promote_options="permissive",
+        )
+        dataset = ds.dataset(
+            paths,
+            schema=schema,
+            format="parquet",
+            partitioning=_PARTITIONING,
+            partition_base_dir=self.directory,
+        )
+        row_filter = None
+        if wanted:
+            date_type = schema.field(DATE_COLUMN).type
+            start, end = (pa.scalar(pd.Timestamp(d), date_type) for d in wanted)
+            row_filter = (ds.field(DATE_COLUMN) >= start) & (ds.field(DATE_COLUMN) < end)
+        columns = columns or [n for n in schema.names if n != "ticker"]
+        table = dataset.to_table(
+            columns=[*columns, "ticker", "__filename"],
+            filter=row_filter,
+        )
+
+        # Parts are named in write order, so the newest copy of a date is last
+        long = table.to_pandas()
+        long = long.sort_values(["ticker", DATE_COLUMN, "__filename"], kind="stable")
+        long = long.drop_duplicates(subset=["ticker", DATE_COLUMN], keep="last")
+        return long.drop(columns="__filename").reset_index(drop=True)
+
+    def _parts(self, tickers: list[str]) -> list[str]:
+        """Paths of the tickers' parts, oldest first within each ticker."""
+        paths = []
+        for ticker in tickers:
+            ticker_dir = self._ticker_dir(ticker)
+            if os.path.isdir(ticker_dir):
+                names = sorted(n for n in os.listdir(ticker_dir) if n.startswith("part-"))
+                paths.extend(os.path.join(ticker_dir, n) for n in names)
+        return paths
+
+    def append(self, ticker: str, df: pd.DataFrame, covered: list[Range]) -> None:
+        """
+        Add downloaded rows and mark their ranges as covered.
+
+        Today is never marked covered, since its bar is still changing;
+        it is fetched again on the next run.
+        """
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        self._write_part(ticker, df)
+        self._write_meta(ticker, df, self.coverage(ticker) + covered)
+        if len(self._parts([ticker])) > COMPACT_PARTS:
+            self.replace(ticker, self.load(ticker), self.coverage(ticker))
+
+    def replace(self, ticker: str, df: pd.DataFrame, covered: list[Range]) -> None:
+        """Replace everything stored for a ticker with one part (e.g. to compact)."""
+        if df.empty:
+            raise ValueError(f"Refusing to replace {ticker}'s prices with no rows")
+        old_parts = self._parts([ticker])
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        # The new part sorts after the old ones, so a crash before they
+        # are removed still reads back correctly
+        self._write_part(ticker, df)
+        self._write_meta(ticker, df, covered)
+        for path in old_parts:
+            os.unlink(path)
+
+    def _write_part(self, ticker: str, df: pd.DataFrame) -> None:
+        """Write rows as a new part with one row group per year."""
+        if df.empty:
+            return
+        # Stored as timezone-naive local dates so every ticker shares a schema
+        dates = df.index.tz_localize(None) if df.index.tz else df.index
+        rows = df.set_axis(dates.rename(DATE_COLUMN)).sort_index().reset_index()
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        # Row group statistics let date filters skip whole years
+        years = rows[DATE_COLUMN].dt.year.to_numpy()
+        boundaries = [0, *(years[1:] != years[:-1]).nonzero()[0] + 1, len(rows)]
+
+        def write(path: str) -> None:
+            with pq.ParquetWriter(path, table.schema) as writer:
+                for start, end in zip(boundaries, boundaries[1:]):
+                    writer.write_table(table.slice(start, end - start))
+
+        parts = self._parts([ticker])
+        number = int(os.path.basename(parts[-1])[5:11]) + 1 if parts else 0
+        _write_atomic(self._ticker_dir(ticker), f"part-{number:06d}.parquet", write)
+
+    def _write_meta(self, ticker: str, df: pd.DataFrame, ranges: list[Range]) -> None:
+        today = date.today()
+        ranges = merge_ranges([(s, min(e, today)) for s, e in ranges if s < today])
+        meta = self._meta(ticker)
+        meta["ranges"] = [[s.isoformat(), e.isoformat()] for s, e in ranges]
+        if getattr(df.index, "tz", None):
+            meta["timezone"] = str(df.index.tz)
+        _write_atomic(
+            self._ticker_dir(ticker),
+            _META_FILE,
+            lambda path: _write_text(path, json.dumps(meta)),
+        )
+
+
+class CPIStore:
+    """Monthly CPI series cache that tracks which years are complete."""
+
+    def __init__(self, directory: str = CPI_DIR):
+        self.directory = directory
+        self._series_path = os.path.join(directory, "monthly.parquet")
+        self._meta_path = os.path.join(directory, _META_FILE)
+
+    def load(self) -> pd.Series:
+        """Read the stored monthly series (empty if nothing is stored)."""
+        try:
+            return pd.read_parquet(self._series_path)["cpi"]
+        except (OSError, KeyError):
+            return pd.Series(dtype=float, name="cpi", index=pd.DatetimeIndex([], name="date"))
+
+    def _meta(self) -> dict:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def years_to_fetch(self, first: int, last: int) -> list[int]:
+        """
+        Years in [first, last] that need to be requested from BLS.
+
+        A final year is never requested again. An open year (usually the
+        current one) is requested when its next monthly release is due,
+        at most once every CACHE_EXPIRY_DAYS.
+        """
+        meta = self._meta()
+        final = set(meta.get("final_years", []))
+        checked = meta.get("checked", {})
+        stored = self.load()
+        today = date.today()
+
+        years = []
+        for year in range(first, last + 1):
+            if year in final:
+                continue
+            checked_on = checked.get(str(year))
+            if checked_on and today - date.fromisoformat(checked_on) < timedelta(
+                days=CACHE_EXPIRY_DAYS
+            ):
+                continue
+            months = stored[stored.index.year == year]
+            if not months.empty:
+                # Month m is published early in month m + 1 or m + 2
+                latest = months.index.max()
+                due = (latest + pd.DateOffset(months=2)).date()
+                if today < due:
+                    continue
+            years.append(year)
+        return years
+
+    def update(self, fetched: pd.Series, years: list[int]) -> pd.Series:
+        """
+        Merge newly fetched months for some years into the stored series.
+
+        Returns the merged series.
+        """
+        series = fetched.combine_first(self.load()).sort_index()
+        series.name = "cpi"
+        series.index.name = "date"
+
+        meta = self._meta()
+        final = set(meta.get("final_years", []))
+        checked = meta.get("checked", {})
+        today = date.today()
+        for year in years:
+            # December's figure is out by February, so after that the year is done
+            if today >= date(year + 1, 2, 1):
+                final.add(year)
+                checked.pop(str(year), None)
+            else:
+                checked[str(year)] = today.isoformat()
+        meta = {"final_years": sorted(final), "checked": checked}
+
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self.directory, "monthly.parquet", series.to_frame().to_parquet)
+        _write_atomic(
+            self.directory,
+            _META_FILE,
+            lambda path: _write_text(path, json.dumps(meta)),
+        )
+        return series
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _write_atomic(directory: str, name: str, write) -> None:
+    """Write a file via a temp file and rename, so readers never see it partial."""
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, os.path.join(directory, name))
+    except BaseException:
+        os.unlink(tmp)
+        raise